@@ -1,19 +1,32 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+
 import dash
-from dash import dcc, html
+from dash import html
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import plotly.io as pio
+import orjson
 
 import pycountry
-import pycountry_convert as pc
 
 from flask_caching import Cache
 
 # Import functions from external preprocessing_scripts
 from dash_pages_scripts.choropleth import get_choropleth_layout, register_choropleth_callbacks
 from dash_pages_scripts.metric_analysis import get_metric_analysis_layout, register_callbacks_metrics
-from dash_pages_scripts.correlation_page import get_correlation_layout, register_callbacks_corr
-from dash_pages_scripts.overview import create_overview_layout, register_callbacks_overview
+from dash_pages_scripts.correlation_page import (get_correlation_layout, register_callbacks_corr,
+                                                 pairwise_corr, mean_by_country_year)
+from dash_pages_scripts.overview import (create_overview_layout, register_callbacks_overview,
+                                         compute_year_means)
 
 
 continent_map = {
@@ -24,6 +37,46 @@ continent_map = {
 manual_region_mapping = {
     'XKX': 'Europe', 'OWID_KOS': 'Europe', 'SXM': 'North America', 'TLS': 'Asia'}
 
+# ISO 3166-1 alpha-2 code to continent code, as assigned by pycountry_convert
+ALPHA2_TO_CONTINENT = {
+    'AD': 'EU', 'AE': 'AS', 'AF': 'AS', 'AG': 'NA', 'AI': 'NA', 'AL': 'EU', 'AM': 'AS',
+    'AO': 'AF', 'AR': 'SA', 'AS': 'OC', 'AT': 'EU', 'AU': 'OC', 'AW': 'NA', 'AX': 'EU',
+    'AZ': 'AS', 'BA': 'EU', 'BB': 'NA', 'BD': 'AS', 'BE': 'EU', 'BF': 'AF', 'BG': 'EU',
+    'BH': 'AS', 'BI': 'AF', 'BJ': 'AF', 'BL': 'NA', 'BM': 'NA', 'BN': 'AS', 'BO': 'SA',
+    'BQ': 'NA', 'BR': 'SA', 'BS': 'NA', 'BT': 'AS', 'BV': 'AN', 'BW': 'AF', 'BY': 'EU',
+    'BZ': 'NA', 'CA': 'NA', 'CC': 'AS', 'CD': 'AF', 'CF': 'AF', 'CG': 'AF', 'CH': 'EU',
+    'CI': 'AF', 'CK': 'OC', 'CL': 'SA', 'CM': 'AF', 'CN': 'AS', 'CO': 'SA', 'CR': 'NA',
+    'CU': 'NA', 'CV': 'AF', 'CW': 'NA', 'CX': 'AS', 'CY': 'AS', 'CZ': 'EU', 'DE': 'EU',
+    'DJ': 'AF', 'DK': 'EU', 'DM': 'NA', 'DO': 'NA', 'DZ': 'AF', 'EC': 'SA', 'EE': 'EU',
+    'EG': 'AF', 'ER': 'AF', 'ES': 'EU', 'ET': 'AF', 'FI': 'EU', 'FJ': 'OC', 'FK': 'SA',
+    'FM': 'OC', 'FO': 'EU', 'FR': 'EU', 'GA': 'AF', 'GB': 'EU', 'GD': 'NA', 'GE': 'AS',
+    'GF': 'SA', 'GG': 'EU', 'GH': 'AF', 'GI': 'EU', 'GL': 'NA', 'GM': 'AF', 'GN': 'AF',
+    'GP': 'NA', 'GQ': 'AF', 'GR': 'EU', 'GS': 'SA', 'GT': 'NA', 'GU': 'OC', 'GW': 'AF',
+    'GY': 'SA', 'HK': 'AS', 'HM': 'AN', 'HN': 'NA', 'HR': 'EU', 'HT': 'NA', 'HU': 'EU',
+    'ID': 'AS', 'IE': 'EU', 'IL': 'AS', 'IM': 'EU', 'IN': 'AS', 'IO': 'AS', 'IQ': 'AS',
+    'IR': 'AS', 'IS': 'EU', 'IT': 'EU', 'JE': 'EU', 'JM': 'NA', 'JO': 'AS', 'JP': 'AS',
+    'KE': 'AF', 'KG': 'AS', 'KH': 'AS', 'KI': 'OC', 'KM': 'AF', 'KN': 'NA', 'KP': 'AS',
+    'KR': 'AS', 'KW': 'AS', 'KY': 'NA', 'KZ': 'AS', 'LA': 'AS', 'LB': 'AS', 'LC': 'NA',
+    'LI': 'EU', 'LK': 'AS', 'LR': 'AF', 'LS': 'AF', 'LT': 'EU', 'LU': 'EU', 'LV': 'EU',
+    'LY': 'AF', 'MA': 'AF', 'MC': 'EU', 'MD': 'EU', 'ME': 'EU', 'MF': 'NA', 'MG': 'AF',
+    'MH': 'OC', 'MK': 'EU', 'ML': 'AF', 'MM': 'AS', 'MN': 'AS', 'MO': 'AS', 'MP': 'OC',
+    'MQ': 'NA', 'MR': 'AF', 'MS': 'NA', 'MT': 'EU', 'MU': 'AF', 'MV': 'AS', 'MW': 'AF',
+    'MX': 'NA', 'MY': 'AS', 'MZ': 'AF', 'NA': 'AF', 'NC': 'OC', 'NE': 'AF', 'NF': 'OC',
+    'NG': 'AF', 'NI': 'NA', 'NL': 'EU', 'NO': 'EU', 'NP': 'AS', 'NR': 'OC', 'NU': 'OC',
+    'NZ': 'OC', 'OM': 'AS', 'PA': 'NA', 'PE': 'SA', 'PF': 'OC', 'PG': 'OC', 'PH': 'AS',
+    'PK': 'AS', 'PL': 'EU', 'PM': 'NA', 'PR': 'NA', 'PS': 'AS', 'PT': 'EU', 'PW': 'OC',
+    'PY': 'SA', 'QA': 'AS', 'RE': 'AF', 'RO': 'EU', 'RS': 'EU', 'RU': 'EU', 'RW': 'AF',
+    'SA': 'AS', 'SB': 'OC', 'SC': 'AF', 'SD': 'AF', 'SE': 'EU', 'SG': 'AS', 'SH': 'AF',
+    'SI': 'EU', 'SJ': 'EU', 'SK': 'EU', 'SL': 'AF', 'SM': 'EU', 'SN': 'AF', 'SO': 'AF',
+    'SR': 'SA', 'SS': 'AF', 'ST': 'AF', 'SV': 'NA', 'SY': 'AS', 'SZ': 'AF', 'TC': 'NA',
+    'TD': 'AF', 'TG': 'AF', 'TH': 'AS', 'TJ': 'AS', 'TK': 'OC', 'TM': 'AS', 'TN': 'AF',
+    'TO': 'OC', 'TR': 'AS', 'TT': 'NA', 'TV': 'OC', 'TW': 'AS', 'TZ': 'AF', 'UA': 'EU',
+    'UG': 'AF', 'US': 'NA', 'UY': 'SA', 'UZ': 'AS', 'VC': 'NA', 'VE': 'SA', 'VG': 'NA',
+    'VI': 'NA', 'VN': 'AS', 'VU': 'OC', 'WF': 'OC', 'WS': 'OC', 'YE': 'AS', 'YT': 'AF',
+    'ZA': 'AF', 'ZM': 'AF', 'ZW': 'AF'
+}
+
+@lru_cache(maxsize=512)
 def alpha3_to_alpha2(alpha3_code):
     """
     Convert a three-letter country code (ISO 3166-1 alpha-3) to its corresponding two-letter code (ISO 3166-1 alpha-2).
@@ -38,6 +91,7 @@ def alpha3_to_alpha2(alpha3_code):
     return country.alpha_2 if country else None
 
 
+@lru_cache(maxsize=512)
 def get_region(country_code):
     """
         Determine the continental region for a given country code.
@@ -51,17 +105,121 @@ def get_region(country_code):
         """
     if country_code in manual_region_mapping:
         return manual_region_mapping[country_code]
-    if len(country_code) == 3:
-        country_code = alpha3_to_alpha2(country_code)
-    return continent_map.get(pc.country_alpha2_to_continent_code(country_code), 'Unknown Region')
+    alpha2_code = alpha3_to_alpha2(country_code) if len(country_code) == 3 else country_code
+    return continent_map.get(ALPHA2_TO_CONTINENT.get(alpha2_code), 'Unknown Region')
+
+
+SOURCE_DATA_PATH = "dataset/FINAL_MERGED_DATA_reimputed.parquet"
+DERIVED_DATA_PATH = "dataset/FINAL_MERGED_DATA_with_region.parquet"
+PARQUET_ROW_GROUP_SIZE = 16_384
+
+
+def _prepare_dataset(source_path=SOURCE_DATA_PATH, derived_path=DERIVED_DATA_PATH):
+    """
+    Build the region-enriched dataset once and persist it next to the source file.
+
+    The derived file is only regenerated when it is missing or older than the source, so
+    worker start-ups read the enriched frame straight from disk without any pycountry work.
+
+    Args:
+        source_path (str): Path of the reimputed source parquet file.
+        derived_path (str): Path of the enriched parquet file to create.
+
+    Returns:
+        str: The path of the up-to-date derived parquet file.
+    """
+    if (os.path.exists(derived_path)
+            and os.path.getmtime(derived_path) >= os.path.getmtime(source_path)):
+        return derived_path
+
+    source = pd.read_parquet(source_path, engine="pyarrow")
+
+    # Resolve each distinct country code once, then broadcast by indexing the per-category
+    # region codes with each row's category code (an integer gather, no per-row hashing)
+    country_codes = source['Country_Code'].astype('category')
+    regions = pd.Categorical([get_region(code) for code in country_codes.cat.categories])
+    row_codes = country_codes.cat.codes.to_numpy()
+    region_codes = np.where(row_codes >= 0, regions.codes[row_codes], -1)
+    source['Country_Code'] = country_codes
+    source['Region'] = pd.Categorical.from_codes(region_codes, categories=regions.categories)
+
+    # Cluster rows by year so each row group covers a narrow Year range; readers that pass
+    # parquet filters on Year can then skip whole row groups from their min/max statistics
+    source = source.sort_values('Year', kind='stable', ignore_index=True)
+    table = pa.Table.from_pandas(source, preserve_index=False)
+    pq.write_table(table, derived_path, compression='zstd', use_dictionary=True,
+                   row_group_size=PARQUET_ROW_GROUP_SIZE)
+    return derived_path
+
+
+DATA_PATH = _prepare_dataset()
+DATA_COLUMNS = pq.read_schema(DATA_PATH).names
+
+RISK_FACTOR_COLUMNS = ['Alcohol_Value', 'Diabetes_Prevalence_Rate',
+                       'Activity_Prevalence_Rate', 'Obesity_Prevalence_Rate']
+HEALTH_METRIC_COLUMNS = ['MortalityRate', 'IncidenceRate', 'PrevalenceRate']
+
+# Columns read from the dataset for each page; optional columns missing from the file are skipped
+PAGE_COLUMNS = {
+    'overview': ['Country', 'Country_Code', 'Year', 'Gender', *HEALTH_METRIC_COLUMNS, 'GDP',
+                 'Health_Expenditure (% of GDP)', 'Life_Expectancy', *RISK_FACTOR_COLUMNS],
+    'choropleth': ['Country', 'Country_Code', 'Region', 'Year', 'Age_Group', 'Gender',
+                   *HEALTH_METRIC_COLUMNS, 'GDP', 'Health_Expenditure (% of GDP)', 'Population'],
+    'metric-analysis': ['Country', 'Country_Code', 'Region', 'Year', 'Age_Group', 'Gender',
+                        'MortalityRate', 'PrevalenceRate', *RISK_FACTOR_COLUMNS],
+    'correlation': [col for col in DATA_COLUMNS if col not in ['Country_Code', 'Region']],
+    'sankey': ['Country', *RISK_FACTOR_COLUMNS, *HEALTH_METRIC_COLUMNS],
+}
+
+# Low-cardinality filter columns each page compares against dropdown values, held as categoricals
+CATEGORY_COLUMNS = {
+    'overview': ['Country', 'Country_Code', 'Gender'],
+    'choropleth': ['Country', 'Age_Group', 'Gender'],
+    'metric-analysis': ['Country', 'Age_Group', 'Gender'],
+    'correlation': ['Country', 'Age_Group', 'Gender'],
+    'sankey': ['Country'],
+}
+
+
+@lru_cache(maxsize=None)
+def load_frame(page_key):
+    """
+    Load the dataset columns needed by a single page.
+
+    Args:
+        page_key (str): Key into PAGE_COLUMNS ('overview', 'choropleth', 'metric-analysis',
+                        'correlation' or 'sankey').
+
+    Returns:
+        pd.DataFrame: The projected dataset, read once per process and shared afterwards.
+    """
+    columns = [col for col in PAGE_COLUMNS[page_key] if col in DATA_COLUMNS]
+    frame = pd.read_parquet(DATA_PATH, columns=columns, engine="pyarrow")
 
+    # Risk factors are plotted as numbers; unparseable entries become NaN once, here
+    for col in RISK_FACTOR_COLUMNS:
+        if col in frame.columns and not pd.api.types.is_numeric_dtype(frame[col]):
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
 
+    # Single precision is ample for the plotted rates and halves the bytes every scan moves
+    float_cols = frame.select_dtypes('float64').columns
+    frame[float_cols] = frame[float_cols].astype('float32')
+    for col in frame.select_dtypes('integer').columns:
+        frame[col] = pd.to_numeric(frame[col], downcast='integer')
 
-df = pd.read_parquet("dataset/FINAL_MERGED_DATA_reimputed.parquet", engine="pyarrow")
-df.loc[:, 'Region'] = df['Country_Code'].apply(get_region)
+    for col in CATEGORY_COLUMNS.get(page_key, []):
+        if col in frame.columns:
+            frame[col] = frame[col].astype('category')
 
-corr_data = df.copy()
-corr_data = corr_data.drop(columns=['Country_Code','Region'], axis=1)
+    # Keep free-text columns in Arrow string arrays instead of one Python object per cell
+    for col in frame.select_dtypes('object').columns:
+        frame[col] = frame[col].astype(pd.StringDtype("pyarrow"))
+    return frame
+
+
+# Read all page projections concurrently at startup; pyarrow decodes without holding the GIL
+with ThreadPoolExecutor(max_workers=len(PAGE_COLUMNS)) as _executor:
+    list(_executor.map(load_frame, PAGE_COLUMNS))
 
 
 # Sidebar styling and layout
@@ -117,18 +275,63 @@ app = dash.Dash(
     external_stylesheets=[dbc.themes.BOOTSTRAP,
                           'https://use.fontawesome.com/releases/v5.15.4/css/all.css'],
     meta_tags=[{"name": "viewport",
-                "content": "width=device-width, initial-scale=1"}]
+                "content": "width=device-width, initial-scale=1"}],
+    use_pages=True,
+    pages_folder="",
+    compress=True
 )
 app.config.suppress_callback_exceptions = True
 server = app.server
 
-# Configure caching
+# Dash serializes callback responses through plotly's JSON encoder; pin it to orjson
+pio.json.config.default_engine = "orjson"
+
+# Configure caching (filesystem backend so all gunicorn workers share one cache)
 
 cache = Cache(config={
-    'CACHE_TYPE': 'simple',
-    'CACHE_DEFAULT_TIMEOUT': 300
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': '.flask_cache',
+    'CACHE_DEFAULT_TIMEOUT': 3600,
+    'CACHE_THRESHOLD': 500
 })
 cache.init_app(app.server)
+
+# Part of every cached layout key, so a rebuilt dataset never serves stale pages
+DATASET_VERSION = str(os.path.getmtime(DATA_PATH))
+
+# Part of every cached layout key too: a deploy that changes the app or page code never serves
+# layouts built by the previous release, whose component ids may not match the new callbacks
+APP_SOURCES = [Path(__file__), *sorted(Path(__file__).parent.glob('dash_pages_scripts/*.py'))]
+APP_VERSION = hashlib.sha256(b''.join(path.read_bytes() for path in APP_SOURCES)).hexdigest()[:16]
+
+# Per-year overview means, aggregated once per process rather than per layout build
+YEAR_MEANS = compute_year_means(load_frame('overview'))
+
+# Layout builder and dataset projection for each route
+PAGE_LAYOUTS = {
+    "/": (partial(create_overview_layout, year_means=YEAR_MEANS), 'overview'),
+    "/choropleth": (get_choropleth_layout, 'choropleth'),
+    "/metric-analysis": (get_metric_analysis_layout, 'metric-analysis'),
+    "/correlation": (get_correlation_layout, 'correlation'),
+}
+
+
+@cache.memoize()
+def build_page_layout(pathname, dataset_version, app_version):
+    """
+    Build and serialize the layout for a route, memoized across workers for each dataset and app version.
+
+    Args:
+        pathname (str): A key of PAGE_LAYOUTS.
+        dataset_version (str): Version of the dataset the layout is built from.
+        app_version (str): Version of the app code the layout is built with.
+
+    Returns:
+        str: The JSON form of the page's component tree, including its static figures.
+    """
+    layout_builder, page_key = PAGE_LAYOUTS[pathname]
+    return pio.json.to_json_plotly(layout_builder(load_frame(page_key)), engine="orjson")
+
 # Sidebar with navigation links
 sidebar = html.Div(
     [
@@ -177,77 +380,73 @@ sidebar = html.Div(
 # Layout components
 toggle_button = html.Button(
     "☰", id="sidebar-toggle", className="btn btn-primary", style=TOGGLE_STYLE)
-content = html.Div(id="page-content", style=CONTENT_STYLE1)
+content = html.Div(dash.page_container, id="page-content", style=CONTENT_STYLE1)
 
 # App layout
 app.layout = html.Div([
-    dcc.Location(id="url"),
     sidebar,
     toggle_button,
     content,
 ])
 
-# Callback to update page content
-@app.callback(
-    Output("page-content", "children"),
-    Input("url", "pathname")
-)
-def display_page(pathname):
+# Serialize every page once at startup so the first visit to each route is already cached
+for _pathname in PAGE_LAYOUTS:
+    build_page_layout(_pathname, DATASET_VERSION, APP_VERSION)
+
+
+def page_layout(pathname):
     """
-       Route to the appropriate page layout based on the URL pathname.
+       Create the layout function registered with dash.pages for a route.
 
        Args:
-           pathname (str): The current URL pathname.
+           pathname (str): A key of PAGE_LAYOUTS.
 
        Returns:
-           dash.html.Div: The layout component for the requested page.
+           function: Returns the serialized layout component for the route.
        """
-    if pathname == "/choropleth":
-        return get_choropleth_layout(df)
-    elif pathname == "/metric-analysis":
-        return get_metric_analysis_layout(df)
-    elif pathname == "/correlation":
-        return get_correlation_layout(corr_data)
-    return create_overview_layout(df)
-
-
-
-# Callback to toggle sidebar
-@app.callback(
+    def layout(**kwargs):
+        # Parsed JSON has the same shape as the component tree, so Dash sends it unchanged
+        return orjson.loads(build_page_layout(pathname, DATASET_VERSION, APP_VERSION))
+    return layout
+
+
+# Register each route with the pages router; unknown paths fall back to the overview
+for _pathname, (_, _page_key) in PAGE_LAYOUTS.items():
+    dash.register_page(_page_key, path=_pathname, title=app.title, layout=page_layout(_pathname))
+dash.register_page("not_found_404", title=app.title, layout=page_layout("/"))
+
+
+# Clientside callback to toggle sidebar: a pure style flip, so it never round-trips to the server.
+# Odd click counts hide the sidebar and widen the content; even counts restore the default layout.
+app.clientside_callback(
+    f"""
+    function(n) {{
+        const hidden = Boolean(n) && n % 2 === 1;
+        return hidden
+            ? [{json.dumps(SIDEBAR_HIDDEN)}, {json.dumps(CONTENT_STYLE2)}, {json.dumps(TOGGLE_STYLE_HIDDEN)}]
+            : [{json.dumps(SIDEBAR_STYLE)}, {json.dumps(CONTENT_STYLE1)}, {json.dumps(TOGGLE_STYLE)}];
+    }}
+    """,
     Output("sidebar", "style"),
     Output("page-content", "style"),
     Output("sidebar-toggle", "style"),
     Input("sidebar-toggle", "n_clicks"),
     prevent_initial_call=True
 )
-def toggle_sidebar(n):
-    """
-       Toggle the sidebar visibility and adjust the layout accordingly.
-
-       Args:
-           n (int): Number of times the toggle button has been clicked.
-
-       Returns:
-           tuple: A tuple containing (sidebar_style, content_style, toggle_style) dictionaries
-                  for updating the UI components' styles.
-       """
-    if n and n % 2 == 1:
-        sidebar_style = SIDEBAR_HIDDEN
-        toggle_style = TOGGLE_STYLE_HIDDEN
-        content_style = CONTENT_STYLE2
-    else:
-        sidebar_style = SIDEBAR_STYLE
-        toggle_style = TOGGLE_STYLE
-        content_style = CONTENT_STYLE1
-    return sidebar_style, content_style, toggle_style
-
 
 
 # Register callbacks for pages
-register_callbacks_overview(app,df)
-register_callbacks_metrics(app, df_main=df)
-register_choropleth_callbacks(app, df)
-register_callbacks_corr(app, df, corr_data, cache)
+register_callbacks_overview(app, load_frame('overview'))
+register_callbacks_metrics(app, df_main=load_frame('metric-analysis'))
+register_choropleth_callbacks(app, load_frame('choropleth'))
+
+# Time-invariant aggregates, computed once per process so callbacks only slice them
+corr_aggs = {
+    'corr_matrix': pairwise_corr(load_frame('correlation')),
+    'country_year_means': mean_by_country_year(load_frame('correlation')),
+}
+register_callbacks_corr(app, load_frame('sankey'), load_frame('correlation'), cache, corr_aggs,
+                        dataset_version=DATASET_VERSION)
 
 # Run the app
 if __name__ == "__main__":
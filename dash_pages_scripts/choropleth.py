@@ -1,6 +1,12 @@
-import plotly.express as px
+from functools import lru_cache
+
+import numpy as np
+import orjson
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.colors import qualitative
 import pandas as pd
-from dash import html, dcc
+from dash import html, dcc, ctx, Patch
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output
 
@@ -13,15 +19,240 @@ tooltip_style = {
     "fontSize": "14px"
 }
 
-def create_choropleth(df, year, continent, metric, age_group, gender, economic_indicator=None):
+# Input-independent layout settings of each figure, merged with the per-call title and scope
+_CHOROPLETH_LAYOUT = {
+    'autosize': True,
+    'margin': {"r": 10, "t": 80, "l": 10, "b": 10},
+    'geo': {
+        'showframe': False,
+        'projection_type': 'natural earth',
+        'projection_scale': 1.2
+    },
+    'hoverlabel': {
+        'bgcolor': "white",
+        'font_size': 14,
+        'bordercolor': "#e5e5e5",
+        'font_family': "Arial, sans-serif"
+    }
+}
+
+_BARPLOT_LAYOUT = {
+    'height': 700,
+    'title_x': 0.5,
+    'yaxis_title': 'Country',
+    'bargap': 0.2,
+    'template': 'plotly_white',
+    'hoverlabel': {
+        'bgcolor': "white",
+        'font_size': 16,
+        'font_family': "Arial, sans-serif",
+        'bordercolor': "#e5e5e5"
+    }
+}
+
+_SCATTER_LAYOUT = {
+    'height': 700,
+    'title_x': 0.5,
+    'template': 'plotly_white',
+    'hoverlabel': {
+        'bgcolor': "white",
+        'font_size': 14,
+        'font_family': "Arial, sans-serif",
+        'bordercolor': "#e5e5e5"
+    }
+}
+
+# Dropdown options that do not depend on the dataset
+METRIC_OPTIONS = [
+    {'label': 'Mortality Rate', 'value': 'MortalityRate'},
+    {'label': 'Incidence Rate', 'value': 'IncidenceRate'},
+    {'label': 'Prevalence Rate', 'value': 'PrevalenceRate'}
+]
+
+ECONOMIC_INDICATOR_OPTIONS = [
+    {'label': 'None', 'value': 'None'},
+    {'label': 'GDP per capita', 'value': 'GDP'},
+    {'label': 'Health Expenditure (% of GDP)', 'value': 'Health_Expenditure (% of GDP)'}
+]
+
+GENDER_OPTIONS = [
+    {'label': 'All', 'value': 'All'},
+    {'label': 'Female', 'value': 'Female'},
+    {'label': 'Male', 'value': 'Male'}
+]
+
+# Colors assigned to per-group traces, in order of first appearance
+_TRACE_COLORS = qualitative.Plotly
+
+FILTER_LEVELS = ['Year', 'Region', 'Age_Group', 'Gender']
+
+# Numeric columns shown in the bar plot hover text, pre-formatted once per row into "<column>_formatted"
+HOVER_VALUE_COLUMNS = ['MortalityRate', 'IncidenceRate', 'PrevalenceRate', 'GDP']
+
+# Choropleth hovertemplate lines for the economic values, formatted in the browser;
+# customdata[i] is replaced by the value's position in each trace's customdata
+HOVER_LINES = {
+    'GDP': (
+        "<span style='color: #7f8c8d; font-size: 12px;'>💰 GDP:</span> "
+        "<span style='font-size: 12px; color: #e67e22; font-weight: 500;'>$%{customdata[i]:,.2f}</span><br>"
+    ),
+    'Health_Expenditure (% of GDP)': (
+        "<span style='color: #7f8c8d; font-size: 12px;'>🏥 Health Expenditure:</span> "
+        "<span style='color: #e74c3c; font-weight: 500; font-size: 12px;'>%{customdata[i]:,.2f}%</span>"
+    )
+}
+
+# Dropdowns that only change which rows a map shows, not its title, colour axis or scope
+DATA_ONLY_INPUTS = {"age-group-dropdown.value", "gender-dropdown.value"}
+
+# Dataset registered by register_choropleth_callbacks, and the row positions of each
+# (Age_Group, Gender) group within it, partitioned by (Year, Region) with "All" covering every region
+_DF = None
+_YEAR_REGION_GROUPS = {}
+
+
+def _set_df(df):
     """
-        Creates a choropleth map visualization of health or economic metrics by country.
+        Registers the dataset shared by the plot builders and precomputes its filter groups.
 
         Parameters
         ----------
         df : pandas.DataFrame
             DataFrame containing country-level data with columns for Year, Region, Country_Code,
             Age_Group, Gender, and various metrics (MortalityRate, IncidenceRate, PrevalenceRate, GDP, etc.)
+        """
+    global _DF, _YEAR_REGION_GROUPS
+    _DF = df.reset_index(drop=True)
+    # Number formatting is the only per-row Python work in the hover text; pay it once here and
+    # keep the results in Arrow string arrays rather than one Python object per cell
+    for col in HOVER_VALUE_COLUMNS:
+        if col in _DF.columns:
+            _DF[f'{col}_formatted'] = _DF[col].map('{:,.2f}'.format).astype(pd.StringDtype("pyarrow"))
+    _YEAR_REGION_GROUPS = {}
+    all_regions = {}
+    groups = _DF.groupby(FILTER_LEVELS, sort=False, observed=True, dropna=False).indices
+    for (year, region, age_group, gender), positions in groups.items():
+        _YEAR_REGION_GROUPS.setdefault((year, region), {})[(age_group, gender)] = positions
+        all_regions.setdefault((year, age_group, gender), []).append(positions)
+    for (year, age_group, gender), parts in all_regions.items():
+        _YEAR_REGION_GROUPS.setdefault((year, 'All'), {})[(age_group, gender)] = np.sort(np.concatenate(parts))
+    for cached in (_get_indexer, _filtered, _figure_json):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=128)
+def _get_indexer(year, continent, age_group, gender):
+    """
+        Returns the row positions matching the dropdown filters, in dataset order.
+
+        The year and continent select one precomputed partition; "All" genders and the
+        'Age-standardized' age group match every group on that level, so those selections
+        concatenate the positions of several groups within it.
+
+        Parameters
+        ----------
+        year : int
+            The year to filter data for
+        continent : str
+            The continent/region to filter for ("All" or specific continent name)
+        age_group : str
+            Age group to filter for ('Age-standardized' or specific age group)
+        gender : str
+            Gender to filter for ('All', 'Male', 'Female' or 'Both')
+
+        Returns
+        -------
+        numpy.ndarray
+            Sorted integer row positions into the registered dataset
+        """
+    wanted = (None if age_group == "Age-standardized" else age_group,
+              None if gender == "All" else gender)
+    parts = [positions for key, positions in _YEAR_REGION_GROUPS.get((year, continent), {}).items()
+             if all(want is None or want == value for want, value in zip(wanted, key))]
+    if not parts:
+        return np.empty(0, dtype=np.intp)
+    return np.sort(np.concatenate(parts))
+
+
+@lru_cache(maxsize=128)
+def _filtered(year, continent, age_group, gender):
+    """
+        Returns the registered rows matching the dropdown filters, cached per filter combination.
+
+        Takes the same filters as _get_indexer. The returned frame is shared between callers and must not be modified in place.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The matching rows, gathered with a single take over the precomputed positions
+        """
+    return _DF.take(_get_indexer(year, continent, age_group, gender)).reset_index(drop=True)
+
+
+@lru_cache(maxsize=256)
+def _figure_json(builder, *args):
+    """
+        Returns the serialized figure of a plot builder, cached per builder and dropdown arguments.
+
+        Caching the JSON rather than the Figure skips both the figure construction and plotly's
+        serialization on repeat requests; Dash sends the parsed JSON unchanged.
+
+        Parameters
+        ----------
+        builder : callable
+            One of the create_* figure builders
+        *args
+            The builder's positional arguments
+
+        Returns
+        -------
+        dict
+            The figure in its JSON form
+        """
+    return orjson.loads(pio.json.to_json_plotly(builder(*args), engine="orjson"))
+
+
+def _choropleth_data_patch(figure):
+    """
+        Returns a partial update replacing only the per-country arrays of a choropleth.
+
+        Used when the triggering dropdowns are all in DATA_ONLY_INPUTS, so the browser keeps the
+        map's layout and only receives the new traces with their locations, values and hover data.
+
+        Parameters
+        ----------
+        figure : dict
+            The serialized choropleth figure for the new selection
+
+        Returns
+        -------
+        dash.Patch
+            A patch of the figure's traces
+        """
+    patch = Patch()
+    patch['data'] = figure['data']
+    return patch
+
+
+def _data_only_trigger():
+    """
+        Returns whether the running callback was triggered only by dropdowns in DATA_ONLY_INPUTS.
+
+        Returns
+        -------
+        bool
+            False on the initial call, so the first render always sends the full figure
+        """
+    triggered = set(ctx.triggered_prop_ids)
+    return bool(triggered) and triggered <= DATA_ONLY_INPUTS
+
+
+def create_choropleth(year, continent, metric, age_group, gender, economic_indicator=None):
+    """
+        Creates a choropleth map visualization of health or economic metrics by country.
+
+        Parameters
+        ----------
         year : int
             The year to filter data for
         continent : str
@@ -40,14 +271,6 @@ def create_choropleth(df, year, continent, metric, age_group, gender, economic_i
         plotly.graph_objects.Figure
             A choropleth map figure object with hover tooltips and customized styling
         """
-    filtered_df = df[df['Year'] == year]
-    if continent != "All":
-        filtered_df = filtered_df[filtered_df['Region'] == continent]
-    if age_group != "Age-standardized":
-        filtered_df = filtered_df[filtered_df['Age_Group'] == age_group]
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['Gender'] == gender]
-
     metric_labels = {
         'MortalityRate': 'Mortality Rate (per 100,000)',
         'IncidenceRate': 'Incidence Rate (per 100,000)',
@@ -63,6 +286,10 @@ def create_choropleth(df, year, continent, metric, age_group, gender, economic_i
         selected_metric = metric
         color_scale = 'Gnbu'
 
+    # Rows without a value or a country code draw nothing, so skip their hover text as well
+    filtered_df = _filtered(year, continent, age_group, gender).dropna(
+        subset=[selected_metric, 'Country_Code'])
+
     continent_scope_mapping = {
         'North America': 'north america',
         'South America': 'south america',
@@ -73,83 +300,68 @@ def create_choropleth(df, year, continent, metric, age_group, gender, economic_i
         'All': 'world'
     }
 
-    # Updated hover text with lighter styling and better spacing
-    filtered_df = filtered_df.copy() # Avoiding SettingWithCopyWarning
-    filtered_df.loc[:, 'Hover_Text'] = filtered_df.apply(
-        lambda row: (
-            f"<span style='font-family: Arial, sans-serif;'>"
-            f"<span style='font-size: 16px; color: #2c3e50; font-weight: 600;'>{row['Country']}</span><br><br>"
-            f"<span style='color: #7f8c8d; font-size: 12px;'>📅 Year:</span> "
-            f"<span style='color: #3498db; font-weight: 500;font-size: 12px;'>{year}</span><br>"
-            f"<span style='color: #7f8c8d; font-size: 12px;'>📊 {metric_labels[selected_metric]}:</span> "
-            f"<span style='color: #27ae60; font-weight: 500; font-size: 12px;'"
-            f">{row[selected_metric]:,.2f}</span><br>"
-            + (f"<span style='color: #7f8c8d; font-size: 12px;'>💰 GDP:</span> "
-               f"<span style='font-size: 12px; color: #e67e22; font-weight: 500;'>${row['GDP']:,.2f}</span><br>"
-               if ('GDP' in filtered_df.columns and pd.notna(row['GDP']) and
-                   selected_metric != 'GDP') else "")
-            + (f"<span style='color: #7f8c8d; font-size: 12px;'>🏥 Health Expenditure:</span> "
-               f"<span style='color: #e74c3c; font-weight: 500; font-size: 12px;'"
-               f">{row['Health_Expenditure (% of GDP)']:,.2f}%</span>"
-               if ('Health_Expenditure (% of GDP)' in filtered_df.columns and
-                   pd.notna(row['Health_Expenditure (% of GDP)']) and
-                   selected_metric != 'Health_Expenditure (% of GDP)') else "")
-            + "</span>"
-        ),
-        axis=1
+    # Updated hover text with lighter styling and better spacing, formatted by the browser from
+    # the country name and raw values in customdata instead of one HTML string per row
+    header = (
+        "<span style='font-family: Arial, sans-serif;'>"
+        "<span style='font-size: 16px; color: #2c3e50; font-weight: 600;'>%{customdata[0]}</span><br><br>"
+        "<span style='color: #7f8c8d; font-size: 12px;'>📅 Year:</span> "
+        f"<span style='color: #3498db; font-weight: 500;font-size: 12px;'>{year}</span><br>"
+        f"<span style='color: #7f8c8d; font-size: 12px;'>📊 {metric_labels[selected_metric]}:</span> "
+        "<span style='color: #27ae60; font-weight: 500; font-size: 12px;'>%{z:,.2f}</span><br>"
     )
-
-    fig = px.choropleth(
-        filtered_df,
-        locations='Country_Code',
-        color=selected_metric,
-        hover_name=None,
-        hover_data={'Hover_Text': True, 'Country_Code': False},
-        custom_data=['Hover_Text'],  # Add custom data for hover template
-        color_continuous_scale=color_scale,
-        title=f'{metric_labels.get(selected_metric, selected_metric)} Distribution ({year})'
-    )
-
-    # Update hover template to use custom hover text
-    fig.update_traces(
-        hovertemplate="%{customdata[0]}<extra></extra>"
+    # Lines for the other economic values, left out of the hover for rows missing that value
+    optional_lines = [(col, line) for col, line in HOVER_LINES.items()
+                      if col in filtered_df.columns and col != selected_metric]
+    customdata = filtered_df[['Country'] + [col for col, _ in optional_lines]].astype(object).to_numpy()
+    present = np.ones((len(filtered_df), len(optional_lines)), dtype=bool)
+    for i, (col, _) in enumerate(optional_lines):
+        present[:, i] = filtered_df[col].notna().to_numpy()
+    patterns, pattern_codes = np.unique(present, axis=0, return_inverse=True)
+
+    # One trace per combination of missing values, all sharing the colour axis
+    traces = []
+    for code, pattern in enumerate(patterns):
+        rows = np.flatnonzero(pattern_codes.ravel() == code)
+        lines = "".join(line.replace('customdata[i]', f'customdata[{i + 1}]')
+                        for i, ((_, line), shown) in enumerate(zip(optional_lines, pattern)) if shown)
+        traces.append(go.Choropleth(
+            locations=filtered_df['Country_Code'].to_numpy()[rows],
+            z=filtered_df[selected_metric].to_numpy()[rows],
+            coloraxis='coloraxis',
+            customdata=customdata[rows],  # Add custom data for hover template
+            hovertemplate=header + lines + "</span><extra></extra>",
+            name=''
+        ))
+
+    fig = go.Figure(
+        traces or go.Choropleth(coloraxis='coloraxis', name=''),
+        layout=dict(
+            title=f'{metric_labels.get(selected_metric, selected_metric)} Distribution ({year})',
+            coloraxis=dict(colorscale=color_scale)
+        )
     )
 
     fig.update_layout(
-        autosize=True,
-        margin={"r": 10, "t": 80, "l": 10, "b": 10},
+        {**_CHOROPLETH_LAYOUT,
+         'geo': {**_CHOROPLETH_LAYOUT['geo'], 'scope': continent_scope_mapping.get(continent, 'world')}},
         coloraxis_colorbar=dict(
             title=f"{selected_metric.replace('_', ' ').title()} (%)",
             x=1.05,
             len=0.6,
             thickness=20
-        ),
-        geo=dict(
-            showframe=False,
-            projection_type='natural earth',
-            projection_scale=1.2,
-            scope=continent_scope_mapping.get(continent, 'world')
-        ),
-        hoverlabel=dict(
-            bgcolor="white",
-            font_size=14,
-            bordercolor="#e5e5e5",
-            font_family="Arial, sans-serif"
         )
     )
 
     return fig
 
 
-def create_barplot(df, year, continent, metric, age_group, gender):
+def create_barplot(year, continent, metric, age_group, gender):
     """
        Creates a horizontal bar plot showing top 10 countries for a selected health metric.
 
        Parameters
        ----------
-       df : pandas.DataFrame
-           DataFrame containing country-level data with columns for Year, Region, Country,
-           Age_Group, Gender, and various health metrics
        year : int
            The year to filter data for
        continent : str
@@ -166,87 +378,99 @@ def create_barplot(df, year, continent, metric, age_group, gender):
        plotly.graph_objects.Figure
            A horizontal bar plot figure showing the top 10 countries for the selected metric
        """
-    filtered_df = df[df['Year'] == year]
-    if continent != "All":
-        filtered_df = filtered_df[filtered_df['Region'] == continent]
-    if age_group != "Age-standardized":
-        filtered_df = filtered_df[filtered_df['Age_Group'] == age_group]
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['Gender'] == gender]
+    filtered_df = _filtered(year, continent, age_group, gender)
 
     # Ensure data is available
     if filtered_df.empty:
-        return px.bar(
-            title=f'No data available for selected filters',
-            labels={'x': 'Country', 'y': metric}
-        )
-
-    # Handle NaN values and sorting
-    top_10_countries = (
-        filtered_df.dropna(subset=[metric])
-        .nlargest(10, metric)[['Country', metric, 'Region', 'GDP']]
-        # Sort in ascending order for better bar chart visualization
-        .sort_values(metric, ascending=True)
-    )
-
-    # Create custom hover text with rich formatting
-    top_10_countries['hover_text'] = top_10_countries.apply(
-        lambda row: (
-            f"<span style='font-family: Arial, sans-serif; font-size: 16px;'>"
-            f"<b style='color: #2c3e50;'>{row['Country']}</b><br><br>"
-            f"<span style='color: #7f8c8d;'>🌐 Region:</span> "
-            f"<span style='color: #3498db; font-weight: bold;'>{row['Region']}</span><br>"
-            f"<span style='color: #7f8c8d;'>📊 {metric.replace('_', ' ').title()}:</span> "
-            f"<span style='color: #27ae60; font-weight: bold;'>{row[metric]:,.2f}</span><br>"
-            f"<span style='color: #7f8c8d;'>💰 GDP per capita:</span> "
-            f"<span style='color: #e67e22; font-weight: bold;'>${row['GDP']:,.2f}</span>"
-            "</span>"
-        ),
-        axis=1
+        return go.Figure(layout=dict(title='No data available for selected filters'))
+
+    # Handle NaN values, then pick the top 10 with an O(n) partition instead of a full sort
+    ranked_df = filtered_df.dropna(subset=[metric])
+    values = ranked_df[metric].to_numpy()
+    k = min(10, len(values))
+    top_positions = np.argpartition(values, -k)[-k:] if k else np.empty(0, dtype=np.intp)
+    # Sort only those rows, in ascending order for better bar chart visualization
+    top_positions = top_positions[np.argsort(values[top_positions], kind='stable')]
+    top_10_countries = ranked_df.iloc[top_positions][['Country', metric, 'Region', 'GDP',
+                                                      f'{metric}_formatted', 'GDP_formatted']].copy()
+
+    # Create custom hover text with rich formatting, built column-wise
+    top_10_countries['hover_text'] = (
+        "<span style='font-family: Arial, sans-serif; font-size: 16px;'>"
+        "<b style='color: #2c3e50;'>"
+        + top_10_countries['Country'].astype(pd.StringDtype("pyarrow")) + "</b><br><br>"
+        "<span style='color: #7f8c8d;'>🌐 Region:</span> "
+        "<span style='color: #3498db; font-weight: bold;'>"
+        + top_10_countries['Region'].astype(pd.StringDtype("pyarrow")) + "</span><br>"
+        f"<span style='color: #7f8c8d;'>📊 {metric.replace('_', ' ').title()}:</span> "
+        "<span style='color: #27ae60; font-weight: bold;'>"
+        + top_10_countries[f'{metric}_formatted'] + "</span><br>"
+        "<span style='color: #7f8c8d;'>💰 GDP per capita:</span> "
+        "<span style='color: #e67e22; font-weight: bold;'>$"
+        + top_10_countries['GDP_formatted'] + "</span>"
+        "</span>"
     )
 
-    # Enhanced bar plot with more styling
-    fig = px.bar(
-        top_10_countries,
-        x=metric,
-        y='Country',
-        orientation='h',
-        color='Country',
-        custom_data=['hover_text'],  # Add custom hover data
-        title=f'Top 10 Countries - {metric.replace("_", " ").title()} ({year})'
-    )
-
-    fig.update_traces(
-        # Use custom hover text
-        hovertemplate='%{customdata[0]}<extra></extra>',
+    # Enhanced bar plot with more styling, one coloured trace per country
+    countries = top_10_countries.groupby('Country', sort=False, observed=True)
+    fig = go.Figure(
+        [go.Bar(
+            x=rows[metric],
+            y=rows['Country'].astype(str),
+            orientation='h',
+            name=country,
+            legendgroup=country,
+            marker_color=_TRACE_COLORS[i % len(_TRACE_COLORS)],
+            customdata=rows['hover_text'].to_numpy()[:, None],  # Add custom hover data
+            # Use custom hover text
+            hovertemplate='%{customdata[0]}<extra></extra>'
+        ) for i, (country, rows) in enumerate(countries)],
+        layout=dict(
+            title=f'Top 10 Countries - {metric.replace("_", " ").title()} ({year})',
+            barmode='relative',
+            legend_title_text='Country',
+            # The first (smallest) country is drawn at the top
+            yaxis=dict(categoryorder='array', categoryarray=list(countries.groups)[::-1])
+        )
     )
 
     fig.update_layout(
-        height=700,
-        title_x=0.5,
-        xaxis_title=f'{metric.replace("_", " ").title()}',
-        yaxis_title='Country',
-        bargap=0.2,
-        template='plotly_white',
-        hoverlabel=dict(
-            bgcolor="white",
-            font_size=16,
-            font_family="Arial, sans-serif",
-            bordercolor="#e5e5e5"
-        )
+        **_BARPLOT_LAYOUT,
+        xaxis_title=f'{metric.replace("_", " ").title()}'
     )
 
     return fig
 
 
-def create_scatter_plot(df, year, continent, metric, economic_indicator, age_group, gender):
+def _ols_line(x, y):
+    """
+        Fits an ordinary least squares line with two dot products.
+
+        Parameters
+        ----------
+        x, y : numpy.ndarray
+            float64 arrays of the same length without NaNs
+
+        Returns
+        -------
+        tuple or None
+            (slope, intercept), or None when x has no spread to fit against
+        """
+    x_mean, y_mean = x.mean(), y.mean()
+    x_centered = x - x_mean
+    spread = x_centered @ x_centered
+    if not spread > 0:
+        return None
+    slope = (x_centered @ (y - y_mean)) / spread
+    return slope, y_mean - slope * x_mean
+
+
+def create_scatter_plot(year, continent, metric, economic_indicator, age_group, gender):
     """
         Creates a scatter plot to visualize correlation between health metrics and economic indicators.
 
         Parameters
         ----------
-        df : pandas.DataFrame
-            DataFrame containing country-level data with health and economic indicators
         year : int
             The year to filter data for
         continent : str
@@ -266,53 +490,116 @@ def create_scatter_plot(df, year, continent, metric, economic_indicator, age_gro
             A scatter plot figure with trend line showing correlation between selected metrics
         """
     # Filter data based on user selections
-    filtered_df = df[df['Year'] == year]
-    if continent != "All":
-        filtered_df = filtered_df[filtered_df['Region'] == continent]
-    if age_group != "Age-standardized":
-        filtered_df = filtered_df[filtered_df['Age_Group'] == age_group]
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['Gender'] == gender]
+    filtered_df = _filtered(year, continent, age_group, gender)
 
     # Ensure data is available and drop NaNs
     filtered_df = filtered_df.dropna(subset=[metric, economic_indicator])
 
     if filtered_df.empty:
-        return px.scatter(title=f"No data available for selected filters")
-
-    # Create scatter plot
-    fig = px.scatter(
-        filtered_df,
-        x=economic_indicator,
-        y=metric,
-        color="Region",
-        hover_name="Country",
+        return go.Figure(layout=dict(title="No data available for selected filters"))
+
+    # Create scatter plot with an Ordinary Least Squares (OLS) regression line per region
+    fig = go.Figure(layout=dict(
         title=f'Correlation: {economic_indicator.replace("_", " ")} vs {metric.replace("_", " ")} ({year})',
-        trendline="ols",  # Ordinary Least Squares (OLS) regression line
-        labels={
-            economic_indicator: economic_indicator.replace("_", " ").title(),
-            metric: metric.replace("_", " ").title()
-        }
-    )
+        legend_title_text='Region'
+    ))
+    for i, (region, rows) in enumerate(filtered_df.groupby('Region', sort=False, observed=True)):
+        color = _TRACE_COLORS[i % len(_TRACE_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=rows[economic_indicator], y=rows[metric], mode='markers', name=region, legendgroup=region, marker_color=color,
+            hovertext=rows['Country'].astype(str),
+            hovertemplate='<b>%{hovertext}</b><br><br>' + f'Region={region}<br>'
+                          f'{economic_indicator}=%{{x}}<br>{metric}=%{{y}}<extra></extra>'
+        ))
+        x = rows[economic_indicator].to_numpy(dtype=float)
+        fit = _ols_line(x, rows[metric].to_numpy(dtype=float))
+        if fit is not None:
+            slope, intercept = fit
+            line_x = np.array([x.min(), x.max()])
+            fig.add_trace(go.Scatter(
+                x=line_x, y=slope * line_x + intercept, mode='lines', name=region,
+                legendgroup=region, showlegend=False, line_color=color,
+                hovertemplate=f'<b>OLS trendline</b><br>{metric} = {slope:.4g} * '
+                              f'{economic_indicator} + {intercept:.4g}<extra></extra>'
+            ))
 
     # Improve layout
     fig.update_layout(
-        height=700,
-        title_x=0.5,
-        template='plotly_white',
+        **_SCATTER_LAYOUT,
         xaxis_title=f"{economic_indicator.replace('_', ' ')}",
-        yaxis_title=f"{metric.replace('_', ' ')}",
-        hoverlabel=dict(
-            bgcolor="white",
-            font_size=14,
-            font_family="Arial, sans-serif",
-            bordercolor="#e5e5e5"
-        )
+        yaxis_title=f"{metric.replace('_', ' ')}"
     )
 
     return fig
 
 
+def create_indicator_scatter(year, metric, economic_indicator):
+    """
+        Creates the scatter plot of a health metric against an economic indicator for every country in a year.
+
+        Parameters
+        ----------
+        year : int
+            The year to filter data for
+        metric : str
+            The health metric for y-axis ('MortalityRate', 'IncidenceRate', or 'PrevalenceRate')
+        economic_indicator : str
+            The economic indicator for x-axis ('GDP' or 'Health_Expenditure (% of GDP)')
+
+        Returns
+        -------
+        plotly.graph_objects.Figure
+            A scatter plot coloured by region and sized by population when available
+        """
+    filtered_df = _filtered(year, 'All', 'Age-standardized', 'All')
+    sized = "Population" in filtered_df.columns
+    hovertemplate = f'{economic_indicator}=%{{x}}<br>{metric}=%{{y}}'
+    marker = {}
+    if sized:
+        hovertemplate += '<br>Population=%{marker.size}'
+        # Same scaling as plotly express: the largest population gets a 20px marker by area
+        marker.update(sizemode='area', sizeref=2.0 * filtered_df['Population'].max() / 20 ** 2)
+
+    fig = go.Figure(layout=dict(
+        title=f"{metric} vs {economic_indicator} ({year})",
+        xaxis_title=economic_indicator,
+        yaxis_title=metric,
+        legend_title_text='Region'
+    ))
+    for i, (region, rows) in enumerate(filtered_df.groupby('Region', sort=False, observed=True)):
+        fig.add_trace(go.Scatter(
+            x=rows[economic_indicator],
+            y=rows[metric],
+            mode='markers',
+            name=region,
+            legendgroup=region,
+            marker=dict(marker, color=_TRACE_COLORS[i % len(_TRACE_COLORS)],
+                        size=rows['Population'] if sized else None),
+            hovertext=rows['Country'].astype(str),
+            hovertemplate=f'<b>%{{hovertext}}</b><br><br>Region={region}<br>{hovertemplate}<extra></extra>'
+        ))
+    return fig
+
+
+def placeholder_figure(kind):
+    """
+        Creates a placeholder figure shown when no economic indicator is selected.
+
+        Parameters
+        ----------
+        kind : str
+            'choropleth' for the economic map or 'scatter' for the scatter plot
+
+        Returns
+        -------
+        plotly.graph_objects.Figure
+            An empty figure prompting for an economic indicator
+        """
+    if kind == 'choropleth':
+        return go.Figure(go.Choropleth(), layout=dict(title='Select an Economic Indicator'))
+    return go.Figure(layout=dict(title="Select an Economic Indicator"))
+
+
 def get_choropleth_layout(df):
     """
         Creates the main layout for the choropleth visualization dashboard.
@@ -336,6 +623,11 @@ def get_choropleth_layout(df):
             All components are responsive and include tooltips for user guidance.
         """
     starting_year = df['Year'].min()
+    region_options = [{'label': 'All', 'value': 'All'}] + [{'label': region, 'value': region}
+                                                           for region in df['Region'].unique()]
+    year_options = [{'label': str(year), 'value': year} for year in np.sort(df['Year'].unique())]
+    age_options = [{'label': age, 'value': age} for age in sorted(df['Age_Group'].unique())
+                   if age != 'No Age Group']
 
     dropdown_style = {
         'className': 'responsive-dropdown fw-bold mb-2',
@@ -384,9 +676,7 @@ def get_choropleth_layout(df):
                                     placement="right", style=tooltip_style),
                         dcc.Dropdown(
                             id='continent-dropdown',
-                            options=[{'label': 'All', 'value': 'All'}] +
-                            [{'label': region, 'value': region}
-                                for region in df['Region'].unique()],
+                            options=region_options,
                             value='All',
                             **dropdown_style
                         ),
@@ -401,8 +691,7 @@ def get_choropleth_layout(df):
                                     placement="right", style=tooltip_style),
                         dcc.Dropdown(
                             id='year-dropdown',
-                            options=[{'label': str(year), 'value': year}
-                                     for year in sorted(df['Year'].unique())],
+                            options=year_options,
                             value=starting_year,
                             **dropdown_style
                         ),
@@ -418,14 +707,7 @@ def get_choropleth_layout(df):
                                     placement="right", style=tooltip_style),
                         dcc.Dropdown(
                             id='metric-dropdown',
-                            options=[
-                                {'label': 'Mortality Rate',
-                                    'value': 'MortalityRate'},
-                                {'label': 'Incidence Rate',
-                                    'value': 'IncidenceRate'},
-                                {'label': 'Prevalence Rate',
-                                    'value': 'PrevalenceRate'}
-                            ],
+                            options=METRIC_OPTIONS,
                             value='PrevalenceRate',
                             **dropdown_style
                         ),
@@ -449,12 +731,7 @@ def get_choropleth_layout(df):
                         ),
                         dcc.Dropdown(
                             id='economic-indicator-dropdown',
-                            options=[
-                                {'label': 'None', 'value': 'None'},
-                                {'label': 'GDP per capita', 'value': 'GDP'},
-                                {'label': 'Health Expenditure (% of GDP)',
-                                 'value': 'Health_Expenditure (% of GDP)'}
-                            ],
+                            options=ECONOMIC_INDICATOR_OPTIONS,
                             value='None',
                             **dropdown_style
                         ),
@@ -477,8 +754,7 @@ def get_choropleth_layout(df):
                         ),
                         dcc.Dropdown(
                             id='age-group-dropdown',
-                            options=[{'label': age, 'value': age} for age in sorted(df['Age_Group'].unique()) if
-                                     age != 'No Age Group'],
+                            options=age_options,
                             value='Age-standardized',
                             **dropdown_style
                         ),
@@ -500,11 +776,7 @@ def get_choropleth_layout(df):
                         ),
                         dcc.Dropdown(
                             id='gender-dropdown',
-                            options=[
-                                {'label': 'All', 'value': 'All'},
-                                {'label': 'Female', 'value': 'Female'},
-                                {'label': 'Male', 'value': 'Male'}
-                            ],
+                            options=GENDER_OPTIONS,
                             value='All',
                             **dropdown_style
                         ),
@@ -627,62 +899,88 @@ def register_choropleth_callbacks(app, df):
     - Update the economic indicator map when an economic metric is selected
     - Update the bar plot based on selected filters
     - Update the scatter plot when comparing health and economic metrics
-    - Control visibility of economic map and scatter plot containers
-    All callbacks are triggered by changes to any dropdown selection.
+    - Control visibility of economic map and scatter plot containers, in the browser
+    Each callback is triggered only by the dropdowns its outputs depend on.
     """
+    _set_df(df)
+    default_year = df['Year'].min()
+
+    # Each callback listens only to the dropdowns its figures depend on, so changing one
+    # dropdown rebuilds only the figures that use it
     @app.callback(
         [Output("choropleth-map", "figure"),
-         Output("economic-choropleth-map", "figure"),
-         Output("economic-map-container", "style"),
-         Output("bar-plot", "figure"),
-         Output('scatter-plot', 'figure'),
-         Output("scatter-container", "style")],
+         Output("bar-plot", "figure")],
         [Input("year-dropdown", "value"),
          Input("continent-dropdown", "value"),
          Input("metric-dropdown", "value"),
-         Input("economic-indicator-dropdown", "value"),
          Input("age-group-dropdown", "value"),
          Input("gender-dropdown", "value")],
         prevent_initial_call=False
     )
-    def update_plots(year, continent, metric, economic_indicator, age_group, gender):
+    def update_plots(year, continent, metric, age_group, gender):
         # Set default values
-        year = year or df['Year'].min()
+        year = year or default_year
         continent = continent or 'All'
         metric = metric or 'PrevalenceRate'
         age_group = age_group or 'Age-standardized'
         gender = gender or 'Both'
 
         # Create the primary health metric choropleth and bar plot
-        choropleth_fig = create_choropleth(
-            df, year, continent, metric, age_group, gender)
-        bar_fig = create_barplot(
-            df, year, continent, metric, age_group, gender)
-
-        # Default hidden styles for economic maps and scatter plot
-        economic_map_style = {'display': 'none'}
-        scatter_plot_style = {'display': 'none'}
-
-        # Placeholder figures
-        economic_choropleth_fig = px.choropleth(
-            title='Select an Economic Indicator')
-        scatter_fig = px.scatter(title="Select an Economic Indicator")
-
-        # Show economic choropleth and scatter plot if an economic indicator is selected
-        if economic_indicator and economic_indicator != 'None':
-            economic_choropleth_fig = create_choropleth(
-                df, year, continent, metric, age_group, gender, economic_indicator)
-            economic_map_style = {'display': 'block'}
-            scatter_plot_style = {'display': 'block'}
-
-            scatter_fig = px.scatter(
-                df[df['Year'] == year],
-                x=economic_indicator,
-                y=metric,
-                color="Region",
-                size="Population" if "Population" in df.columns else None,
-                hover_name="Country",
-                title=f"{metric} vs {economic_indicator} ({year})"
-            )
-
-        return choropleth_fig, economic_choropleth_fig, economic_map_style, bar_fig, scatter_fig, scatter_plot_style
+        choropleth_fig = _figure_json(
+            create_choropleth, year, continent, metric, age_group, gender)
+        bar_fig = _figure_json(
+            create_barplot, year, continent, metric, age_group, gender)
+        if _data_only_trigger():
+            choropleth_fig = _choropleth_data_patch(choropleth_fig)
+        return choropleth_fig, bar_fig
+
+    # Showing or hiding the economic map and scatter plot only depends on the indicator
+    # dropdown, so it is toggled in the browser without a server round-trip
+    app.clientside_callback(
+        """
+        function(economic_indicator) {
+            const style = {display: economic_indicator && economic_indicator !== 'None' ? 'block' : 'none'};
+            return [style, style];
+        }
+        """,
+        Output("economic-map-container", "style"),
+        Output("scatter-container", "style"),
+        Input("economic-indicator-dropdown", "value")
+    )
+
+    @app.callback(
+        Output("economic-choropleth-map", "figure"),
+        [Input("year-dropdown", "value"),
+         Input("continent-dropdown", "value"),
+         Input("economic-indicator-dropdown", "value"),
+         Input("age-group-dropdown", "value"),
+         Input("gender-dropdown", "value")],
+        prevent_initial_call=False
+    )
+    def update_economic_map(year, continent, economic_indicator, age_group, gender):
+        # The economic choropleth is only shown when an economic indicator is selected
+        if not economic_indicator or economic_indicator == 'None':
+            return _figure_json(placeholder_figure, 'choropleth')
+
+        # The economic map colours by the indicator, so the health metric does not affect it
+        economic_choropleth_fig = _figure_json(
+            create_choropleth, year or default_year, continent or 'All', None,
+            age_group or 'Age-standardized', gender or 'Both', economic_indicator)
+        if _data_only_trigger():
+            economic_choropleth_fig = _choropleth_data_patch(economic_choropleth_fig)
+        return economic_choropleth_fig
+
+    @app.callback(
+        Output('scatter-plot', 'figure'),
+        [Input("year-dropdown", "value"),
+         Input("metric-dropdown", "value"),
+         Input("economic-indicator-dropdown", "value")],
+        prevent_initial_call=False
+    )
+    def update_indicator_scatter(year, metric, economic_indicator):
+        # The scatter plot is only shown when an economic indicator is selected
+        if not economic_indicator or economic_indicator == 'None':
+            return _figure_json(placeholder_figure, 'scatter')
+
+        return _figure_json(create_indicator_scatter, year or default_year,
+                            metric or 'PrevalenceRate', economic_indicator)
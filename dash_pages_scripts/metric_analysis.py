@@ -1,9 +1,13 @@
-from dash import dcc, html
+from functools import lru_cache, wraps
+
+from dash import dcc, html, ctx, Patch
 import dash_bootstrap_components as dbc
+import numpy as np
+import orjson
 import pandas as pd
-import plotly.express as px
-import pycountry_convert as pc
-from dash.dependencies import Input, Output
+import plotly.graph_objects as go
+import plotly.io as pio
+from dash.dependencies import Input, Output, State
 
 # Color schemes
 BLUE_BLACK = "#17202A"
@@ -12,8 +16,25 @@ MORTALITY_COLORS = ["#154360", "#1F618D", "#17202A", "#5499C7", "#2980B9"]
 AGE_GROUP_COLORS = ["#0B5345", "#117A65", "#148F77", "#1ABC9C", "#48C9B0"]
 RISK_FACTOR_COLORS = ["#0B5345", "#117A65", "#148F77", "#1ABC9C", "#48C9B0"]
 
+# Layout every figure on this page starts from; the plotly_white template is looked up and
+# validated once here instead of for each figure
+BASE_LAYOUT = go.Layout(template='plotly_white')
+
+# Most points a line chart series is sent with; longer series are downsampled
+MAX_LINE_POINTS = 500
+
 card_font = style={"fontWeight": "500","fontSize": "1.25rem", "textAlign": "center"}
 
+# Dropdown options that do not depend on the data
+GENDERS = ['Male', 'Female', 'Both']
+GENDER_OPTIONS = [{"label": gender, "value": gender} for gender in GENDERS]
+RISK_FACTOR_OPTIONS = [
+    {"label": "Alcohol Value", "value": "Alcohol_Value"},
+    {"label": "Diabetes Prevalence Rate", "value": "Diabetes_Prevalence_Rate"},
+    {"label": "Activity Prevalence Rate", "value": "Activity_Prevalence_Rate"},
+    {"label": "Obesity Prevalence Rate", "value": "Obesity_Prevalence_Rate"}
+]
+
 # Layout function
 def get_metric_analysis_layout(df):
     """
@@ -39,13 +60,22 @@ def get_metric_analysis_layout(df):
          - Gender selection
          - Risk factor selection
      """
-    years = sorted(df['Year'].unique())
-    continents = sorted(df['Region'].dropna().unique())
-    countries = sorted(df['Country'].unique())
-    age_groups = sorted(df['Age_Group'].unique())
-    genders = ['Male', 'Female', 'Both']
+    # np.unique returns the distinct values already sorted
+    years = np.unique(df['Year'].to_numpy())
+    continents = np.unique(df['Region'].dropna().to_numpy())
+    countries = np.unique(df['Country'].dropna().to_numpy())
+    age_groups = np.unique(df['Age_Group'].dropna().to_numpy())
+
+    # Each option list is built once; both year dropdowns share the same list
+    year_options = [{"label": str(year), "value": year} for year in years]
+    continent_options = [{"label": cont, "value": cont} for cont in continents]
+    country_options = [{"label": country, "value": country} for country in countries]
+    age_options = [{"label": age, "value": age} for age in age_groups]
     
     return dbc.Container([
+        # Per-series mortality data the clientside line chart callbacks slice from
+        dcc.Store(id='mortality-series-store', data=mortality_series_store(df)),
+
         html.H3("Heart Disease Metric Analysis", className="text-center fw-semibold mb-3 p-3 rounded shadow-sm",
                 style={"fontSize": "clamp(1.7rem, 4vw, 2.7rem)",
                        "background": "linear-gradient(135deg, #17202A 0%, #2C3E50 100%)", "color": "white"}),
@@ -58,7 +88,7 @@ def get_metric_analysis_layout(df):
             dbc.Col(dbc.Card([dbc.CardHeader("Average Prevalence Rate by Continent", style=card_font),
                               dbc.CardBody([
                                   dcc.Dropdown(id='prevalence-year-dropdown',
-                                               options=[{"label": str(year), "value": year} for year in years],
+                                               options=year_options,
                                                value=years[0], clearable=False, className="mb-4"),
                                   dcc.Graph(id='prevalence-rate-continent',  style={"paddingBottom": "14px"})
                               ])], className="shadow-sm border"), width=12, lg=6, className="mb-4"),
@@ -71,7 +101,7 @@ def get_metric_analysis_layout(df):
                                           html.Label("Select Continent:"),
                                           dcc.Dropdown(
                                               id='mortality-continent-dropdown',
-                                              options=[{"label": cont, "value": cont} for cont in continents],
+                                              options=continent_options,
                                               value=continents[0],
                                               clearable=False
                                           )
@@ -81,7 +111,7 @@ def get_metric_analysis_layout(df):
                                           html.Label("Select Age Group:"),
                                           dcc.Dropdown(
                                               id='mortality-age-dropdown',
-                                              options=[{"label": age, "value": age} for age in age_groups],
+                                              options=age_options,
                                               value=age_groups[0],
                                               clearable=False
                                           )
@@ -97,11 +127,11 @@ def get_metric_analysis_layout(df):
             dbc.Col(dbc.Card([dbc.CardHeader("Mortality Rate by Country & Gender", style=card_font ),
                               dbc.CardBody([
                                   dcc.Dropdown(id='mortality-country-dropdown',
-                                               options=[{"label": country, "value": country} for country in countries],
+                                               options=country_options,
                                                value=countries[0], clearable=False),
                                   dcc.Dropdown(id='mortality-gender-dropdown',
-                                               options=[{"label": gender, "value": gender} for gender in genders],
-                                               value=genders[0], clearable=False),
+                                               options=GENDER_OPTIONS,
+                                               value=GENDERS[0], clearable=False),
                                   dcc.Graph(id='country-gender-mortality')
                               ])], className="shadow-sm border"), width=12, className="mb-4"),
         ]),
@@ -110,8 +140,8 @@ def get_metric_analysis_layout(df):
             # Plot 4: Average Mortality Per Country
             dbc.Col(dbc.Card([dbc.CardHeader("Average Mortality Rate Per Country", style=card_font),
                               dbc.CardBody([
-                                  dcc.Dropdown(id='average-mortality-year-dropdown', options=[{"label": str(year), "value": year}
-                             for year in years], value=years[0], clearable=False),
+                                  dcc.Dropdown(id='average-mortality-year-dropdown', options=year_options,
+                                               value=years[0], clearable=False),
                                   dcc.Graph(id='average-mortality-country')
                               ])], className="shadow-sm border"), width=12, className="mb-4"),
         ]),
@@ -120,12 +150,8 @@ def get_metric_analysis_layout(df):
             # Plot 5: Risk Factor Analysis per ccontinent
             dbc.Col(dbc.Card([dbc.CardHeader("Risk Factors Analysis by Continent", style=card_font ),
                               dbc.CardBody([
-                                  dcc.Dropdown(id='risk-factor-dropdown', options=[
-                                      {"label": "Alcohol Value", "value": "Alcohol_Value"},
-                                      {"label": "Diabetes Prevalence Rate", "value": "Diabetes_Prevalence_Rate"},
-                                      {"label": "Activity Prevalence Rate", "value": "Activity_Prevalence_Rate"},
-                                      {"label": "Obesity Prevalence Rate", "value": "Obesity_Prevalence_Rate"}
-                                  ], value="Alcohol_Value", clearable=False),
+                                  dcc.Dropdown(id='risk-factor-dropdown', options=RISK_FACTOR_OPTIONS,
+                                               value="Alcohol_Value", clearable=False),
                                   dcc.Graph(id='risk-factors-by-region-plot')
                               ])], className="shadow-sm border"), width=12, className="mb-4"),
         ]),
@@ -133,6 +159,243 @@ def get_metric_analysis_layout(df):
 
     # Step 2: Register callbacks for the Risk Factors Plot
 
+def group_means(frame, keys, value_col):
+    """
+       Averages a column per observed combination of key values with NumPy bincounts.
+
+       Equivalent to frame.groupby(keys, observed=True)[value_col].mean(): groups are sorted
+       by the keys, rows with a missing key are dropped and missing values are skipped, but
+       the means come from two np.bincount passes over integer group codes.
+
+       Args:
+           frame (pd.DataFrame): Data holding the key columns and the value column
+           keys (list): Columns to group by, outermost first
+           value_col (str): Column to average
+
+       Returns:
+           pd.Series: Mean per group, indexed by a MultiIndex over the keys
+       """
+    codes, levels = zip(*(pd.factorize(frame[key], sort=True) for key in keys))
+    shape = tuple(len(level) for level in levels)
+    keep = np.logical_and.reduce([code >= 0 for code in codes])
+    group_keys = np.ravel_multi_index([code[keep] for code in codes], shape)
+    observed, group_index = np.unique(group_keys, return_inverse=True)
+
+    values = frame[value_col].to_numpy(dtype=np.float64)[keep]
+    present = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        means = (np.bincount(group_index, weights=np.where(present, values, 0.0), minlength=len(observed))
+                 / np.bincount(group_index, weights=present, minlength=len(observed)))
+
+    dtype = frame[value_col].dtype if frame[value_col].dtype.kind == 'f' else np.float64
+    index = pd.MultiIndex(levels=[pd.Index(level) for level in levels],
+                          codes=np.unravel_index(observed, shape), names=keys)
+    return pd.Series(means.astype(dtype), index=index, name=value_col)
+
+
+def group_slice(table, key):
+    """
+       Selects the rows of a pre-aggregated table under its leading index labels.
+
+       Args:
+           table (pd.Series): Aggregated values indexed by a sorted MultiIndex
+           key (scalar or tuple): Labels of the leading index level(s) to select
+
+       Returns:
+           pd.Series: The values indexed by the remaining index levels, empty if the key does
+           not occur
+       """
+    try:
+        return table.loc[key]
+    except KeyError:
+        depth = len(key) if isinstance(key, tuple) else 1
+        return table.iloc[:0].droplevel(list(range(depth)))
+
+
+def region_bar_figure(regions, values, value_col, title, region_colors, countries=None):
+    """
+       Builds a bar chart of a value per continent as a single trace colored by continent.
+
+       Args:
+           regions (array-like): Continent of each bar
+           values (np.ndarray): Height of each bar
+           value_col (str): Name of the plotted value, used as the y axis title
+           title (str): Figure title
+           region_colors (dict): Bar color of each continent
+           countries (array-like, optional): Country of each bar, named on hover when given
+
+       Returns:
+           go.Figure: Bar chart with one bar (or one stack of country bars) per continent
+       """
+    hovertemplate = f"Region=%{{x}}<br>{value_col}=%{{y}}"
+    if countries is not None:
+        hovertemplate += "<br>Country=%{customdata[0]}"
+        countries = np.asarray(countries, dtype=object)[:, None]
+
+    regions = np.asarray(regions, dtype=object)
+    fig = go.Figure(go.Bar(x=regions, y=values,
+                           marker_color=[region_colors[region] for region in regions],
+                           customdata=countries,
+                           hovertemplate=hovertemplate + "<extra></extra>"),
+                    layout=BASE_LAYOUT)
+    fig.update_layout(title=title, barmode='relative',
+                      xaxis_title='Region', yaxis_title=value_col)
+    return fig
+
+
+def mortality_line_figure(frame, title):
+    """
+       Builds the smoothed line chart of the mean mortality rate per year.
+
+       Args:
+           frame (pd.DataFrame): Rows with 'Year' and 'MortalityRate' columns
+           title (str): Figure title
+
+       Returns:
+           go.Figure: Single-line chart of the mortality rate over time
+       """
+    fig = go.Figure(go.Scatter(x=frame['Year'].to_numpy(), y=frame['MortalityRate'].to_numpy(),
+                               mode='lines', line=dict(color=MORTALITY_COLORS[0], shape='spline'),
+                               hovertemplate="Year=%{x}<br>MortalityRate=%{y}<extra></extra>"),
+                    layout=BASE_LAYOUT)
+    fig.update_layout(title=title, xaxis_title='Year', yaxis_title='MortalityRate')
+    return fig
+
+
+def lttb_indices(x, y, threshold):
+    """
+       Picks the points of a line that Largest-Triangle-Three-Buckets downsampling keeps.
+
+       The first and last points are always kept; every bucket in between contributes the point
+       forming the largest triangle with the previously kept point and the next bucket's mean.
+
+       Args:
+           x (np.ndarray): Sorted x values of the line
+           y (np.ndarray): y values of the line; missing values never win a bucket
+           threshold (int): Number of points to keep
+
+       Returns:
+           np.ndarray: Sorted positions of the kept points
+       """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        with np.errstate(invalid='ignore'):
+            avg_x, avg_y = x[end:next_end].mean(), np.nanmean(y[end:next_end])
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = a
+    return kept
+
+
+def mortality_series_store(df):
+    """
+       Builds the data behind the two mortality line charts for the browser to slice.
+
+       Args:
+           df (pd.DataFrame): The metric analysis DataFrame
+
+       Returns:
+           dict: The empty line chart under 'figure', and under 'region_age' and
+           'country_gender' the {'x': years, 'y': mean mortality} series of each continent and
+           age group, and of each country and gender, nested by the two dropdown values
+       """
+    def nested_series(table):
+        series = {}
+        years = table.index.get_level_values('Year').to_numpy().tolist()
+        values = table.astype(object).where(table.notna(), None).tolist()
+        outer_keys, inner_keys = (table.index.get_level_values(i) for i in range(2))
+        for i, (outer, inner) in enumerate(zip(outer_keys, inner_keys)):
+            line = series.setdefault(outer, {}).setdefault(inner, {'x': [], 'y': []})
+            line['x'].append(years[i])
+            line['y'].append(values[i])
+
+        # Keep the payload bounded however many years the data grows to
+        for lines in series.values():
+            for line in lines.values():
+                if len(line['x']) > MAX_LINE_POINTS:
+                    y = np.array([np.nan if v is None else v for v in line['y']], dtype=np.float64)
+                    kept = lttb_indices(np.asarray(line['x'], dtype=np.float64), y, MAX_LINE_POINTS)
+                    line['x'] = [line['x'][k] for k in kept]
+                    line['y'] = [line['y'][k] for k in kept]
+        return series
+
+    empty = pd.DataFrame({'Year': [], 'MortalityRate': []})
+    return {
+        'figure': orjson.loads(pio.json.to_json_plotly(mortality_line_figure(empty, ''), engine="orjson")),
+        'region_age': nested_series(group_means(df, ['Region', 'Age_Group', 'Year'], 'MortalityRate')),
+        'country_gender': nested_series(group_means(df, ['Country', 'Gender', 'Year'], 'MortalityRate')),
+    }
+
+
+# Clientside line chart update: fills the stored empty chart with the selected series and title.
+# SERIES names the store entry and TITLE is a JS template literal over the two dropdown values.
+MORTALITY_LINE_JS = """
+function(first, second, store) {
+    const series = ((store.SERIES || {})[first] || {})[second] || {x: [], y: []};
+    const figure = store.figure;
+    return {
+        ...figure,
+        data: [{...figure.data[0], x: series.x, y: series.y}],
+        layout: {...figure.layout, title: {text: `TITLE`}}
+    };
+}
+"""
+
+
+def figure_patch(figure):
+    """
+       Builds a partial update carrying a figure's traces and its layout apart from the template.
+
+       Args:
+           figure (dict): The serialized figure for the new selection
+
+       Returns:
+           dash.Patch: Patch replacing the traces and the titles, axes and color axis in place
+       """
+    patch = Patch()
+    patch['data'] = figure['data']
+    for key, value in figure['layout'].items():
+        if key != 'template':
+            patch['layout'][key] = value
+    return patch
+
+
+def cached_figure(callback):
+    """
+       Memoizes a figure callback per input values, keeping each figure in serialized form.
+
+       Every callback on this page is a pure function of its dropdown values and the static
+       data, so repeat selections skip both the figure construction and plotly's serialization.
+       The first render sends the whole figure; later dropdown changes only send a Patch of the
+       parts that vary, so the browser keeps the figure's template and updates it in place.
+
+       Args:
+           callback (callable): Callback taking hashable dropdown values and returning a figure
+
+       Returns:
+           callable: The callback returning the figure as a JSON-ready dict, or as a Patch
+           when a dropdown triggered it
+       """
+    @lru_cache(maxsize=128)
+    def serialized(*args):
+        return orjson.loads(pio.json.to_json_plotly(callback(*args), engine="orjson"))
+
+    @wraps(callback)
+    def wrapper(*args):
+        figure = serialized(*args)
+        return figure_patch(figure) if ctx.triggered_id is not None else figure
+    return wrapper
+
+
 def register_callbacks_metrics(app,df_main):
     """
        Registers all callbacks for the metric analysis page components.
@@ -144,15 +407,33 @@ def register_callbacks_metrics(app,df_main):
        Note:
            This function sets up callbacks for:
            - Prevalence rate visualization updates
-           - Age-grouped mortality rate updates
-           - Country-gender mortality rate updates
+           - Age-grouped mortality rate updates (clientside)
+           - Country-gender mortality rate updates (clientside)
            - Average mortality rate updates
            - Risk factor analysis updates
        """
+    # Aggregate once per process; each callback only slices its table for the selected filters
+    prevalence_by_year = group_means(df_main, ['Year', 'Region'], 'PrevalenceRate')
+    mortality_by_year_country = group_means(df_main, ['Year', 'Country_Code', 'Country'], 'MortalityRate')
+    # Fixed color per continent, so a continent keeps its color whichever others have data
+    continents = np.unique(df_main['Region'].dropna().to_numpy())
+    prevalence_colors = {cont: PREVALENCE_COLORS[i % len(PREVALENCE_COLORS)] for i, cont in enumerate(continents)}
+    risk_factor_colors = {cont: RISK_FACTOR_COLORS[i % len(RISK_FACTOR_COLORS)] for i, cont in enumerate(continents)}
+    # Shown for a risk factor missing from the data; built once rather than on every such request
+    invalid_risk_factor_figure = go.Figure(layout=BASE_LAYOUT).update_layout(
+        title="Invalid Selection - No Data Available")
+    # Per-country means of each risk factor, keyed by column; rows missing any field are dropped
+    risk_factor_means = {
+        option['value']: (df_main[['Region', 'Country', option['value']]].dropna()
+                          .groupby(['Region', 'Country'], observed=True)[option['value']].mean())
+        for option in RISK_FACTOR_OPTIONS if option['value'] in df_main.columns
+    }
+
     @app.callback(
         Output('prevalence-rate-continent', 'figure'),
         [Input('prevalence-year-dropdown', 'value')]
     )
+    @cached_figure
     def update_prevalence_rate(year):
         """
                Updates the prevalence rate visualization based on selected year.
@@ -163,70 +444,35 @@ def register_callbacks_metrics(app,df_main):
                Returns:
                    plotly.graph_objects.Figure: Bar chart showing average prevalence rates by continent
                """
-        df_filtered = df_main[df_main['Year'] == year]
-        avg_prevalence = df_filtered.groupby(
-            'Region')['PrevalenceRate'].mean().reset_index()
-        return px.bar(avg_prevalence, x='Region', y='PrevalenceRate',
-                      title=f'Average Prevalence Rate by Continent ({year})',
-                      template='plotly_white', color='Region',
-                      color_discrete_sequence=PREVALENCE_COLORS)
-
-    @app.callback(
+        avg_prevalence = group_slice(prevalence_by_year, year)
+        return region_bar_figure(avg_prevalence.index, avg_prevalence.to_numpy(), 'PrevalenceRate',
+                                 f'Average Prevalence Rate by Continent ({year})', prevalence_colors)
+
+    # The line charts only slice the per-series data shipped with the layout, so they are
+    # redrawn in the browser without a server round trip
+    app.clientside_callback(
+        MORTALITY_LINE_JS.replace('SERIES', 'region_age')
+                         .replace('TITLE', 'Mortality Rate Over Time in ${first} (${second})'),
         Output('age-grouped-mortality', 'figure'),
         [Input('mortality-continent-dropdown', 'value'),
-         Input('mortality-age-dropdown', 'value')]
+         Input('mortality-age-dropdown', 'value')],
+        State('mortality-series-store', 'data')
     )
 
-    def update_age_grouped_mortality(continent, age_group):
-        """
-              Updates the mortality rate visualization based on selected continent and age group.
-
-              Args:
-                  continent (str): Selected continent for filtering data
-                  age_group (str): Selected age group for filtering data
-
-              Returns:
-                  plotly.graph_objects.Figure: Line chart showing mortality rate trends over time
-              """
-        df_filtered = df_main[(df_main['Region'] == continent) & (
-            df_main['Age_Group'] == age_group)]
-        mean_mortality = df_filtered.groupby(
-            'Year')['MortalityRate'].mean().reset_index()
-        return px.line(mean_mortality, x='Year', y='MortalityRate',
-                       title=f'Mortality Rate Over Time in {continent} ({age_group})',
-                       template='plotly_white', line_shape='spline',
-                       color_discrete_sequence=MORTALITY_COLORS)
-    
-    @app.callback(
+    app.clientside_callback(
+        MORTALITY_LINE_JS.replace('SERIES', 'country_gender')
+                         .replace('TITLE', 'Mortality Rate in ${first} (${second})'),
         Output('country-gender-mortality', 'figure'),
         [Input('mortality-country-dropdown', 'value'),
-         Input('mortality-gender-dropdown', 'value')]
+         Input('mortality-gender-dropdown', 'value')],
+        State('mortality-series-store', 'data')
     )
 
-    def update_country_gender_mortality(country, gender):
-        """
-                Updates the mortality rate visualization based on selected country and gender.
-
-                Args:
-                    country (str): Selected country for filtering data
-                    gender (str): Selected gender ('Male', 'Female', or 'Both')
-
-                Returns:
-                    plotly.graph_objects.Figure: Line chart showing mortality rate trends by country and gender
-                """
-        df_filtered = df_main[(df_main['Country'] == country)
-                              & (df_main['Gender'] == gender)]
-        mean_mortality = df_filtered.groupby(
-            'Year')['MortalityRate'].mean().reset_index()
-        return px.line(mean_mortality, x='Year', y='MortalityRate',
-                       title=f'Mortality Rate in {country} ({gender})',
-                       template='plotly_white', line_shape='spline',
-                       color_discrete_sequence=MORTALITY_COLORS)
     @app.callback(
         Output('average-mortality-country', 'figure'),
         [Input('average-mortality-year-dropdown', 'value')]
     )
-
+    @cached_figure
     def update_average_mortality(year):
         """
             Updates the average mortality rate visualization based on selected year.
@@ -237,18 +483,24 @@ def register_callbacks_metrics(app,df_main):
             Returns:
                 plotly.graph_objects.Figure: Bar chart showing average mortality rates by country
             """
-        df_filtered = df_main[df_main['Year'] == year]
-        avg_mortality = df_filtered.groupby(['Country_Code', 'Country'])[
-            'MortalityRate'].mean().reset_index()
-        return px.bar(avg_mortality, x='Country_Code', y='MortalityRate',
-                      title=f'Average Mortality Rate per Country ({year})',
-                      template='plotly_white', color='MortalityRate',
-                      color_continuous_scale=PREVALENCE_COLORS,
-                      hover_data={'Country_Code': False, 'Country': True})
+        avg_mortality = group_slice(mortality_by_year_country, year)
+        values = avg_mortality.to_numpy()
+        fig = go.Figure(go.Bar(
+            x=avg_mortality.index.get_level_values('Country_Code').to_numpy(dtype=object),
+            y=values,
+            marker=dict(color=values, coloraxis='coloraxis'),
+            customdata=avg_mortality.index.get_level_values('Country').to_numpy(dtype=object)[:, None],
+            hovertemplate="MortalityRate=%{marker.color}<br>Country=%{customdata[0]}<extra></extra>"),
+            layout=BASE_LAYOUT)
+        fig.update_layout(title=f'Average Mortality Rate per Country ({year})',
+                          coloraxis=dict(colorscale=PREVALENCE_COLORS, colorbar_title_text='MortalityRate'),
+                          xaxis_title='Country_Code', yaxis_title='MortalityRate')
+        return fig
     @app.callback(
         Output('risk-factors-by-region-plot', 'figure'),
         [Input('risk-factor-dropdown', 'value')]
     )
+    @cached_figure
     def update_risk_factors_plot(risk_factor):
         """
               Updates the risk factors visualization based on selected risk factor.
@@ -264,21 +516,10 @@ def register_callbacks_metrics(app,df_main):
               Note:
                   Includes hover data showing country-specific information for each continent
               """
-        if risk_factor not in df_main.columns:
-            return px.bar(title="Invalid Selection - No Data Available")
-        df_main[risk_factor] = pd.to_numeric(
-            df_main[risk_factor], errors='coerce')
-        # Selecting only necessary columns and dropping missing values
-        df_filtered = df_main[['Region', 'Country', risk_factor]].dropna()
-        # Group data by Continent but keep Country values for hover
-        grouped_df = df_filtered.groupby(['Region', 'Country'], as_index=False)[risk_factor].mean()
-        return px.bar(
-            grouped_df,
-            x="Region",
-            y=risk_factor,
-            title=f'Average {risk_factor.replace("_", " ")} by Continent',
-            template='plotly_white',
-            color="Region",
-            color_discrete_sequence=RISK_FACTOR_COLORS,
-            hover_data={"Country": True}  # Show country names on hover
-        )
+        # Grouped by continent but keeping Country values for hover
+        grouped = risk_factor_means.get(risk_factor)
+        if grouped is None:
+            return invalid_risk_factor_figure
+        return region_bar_figure(grouped.index.get_level_values('Region'), grouped.to_numpy(), risk_factor,
+                                 f'Average {risk_factor.replace("_", " ")} by Continent', risk_factor_colors,
+                                 countries=grouped.index.get_level_values('Country'))  # Show country names on hover
@@ -1,4 +1,3 @@
-import dash
 from dash import dcc, html, dash_table
 from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
@@ -20,26 +19,65 @@ Main Features:
 """
 
 
-# Initialize the Dash app
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[
-        dbc.themes.BOOTSTRAP,
-        dbc.icons.FONT_AWESOME,
-        "https://use.fontawesome.com/releases/v5.15.4/css/all.css"
-    ]
-)
-app.config.suppress_callback_exceptions = True
+# Risk factors shown on the overview cards
+RISK_FACTOR_COLUMNS = ['Obesity_Prevalence_Rate', 'Activity_Prevalence_Rate', 'Alcohol_Value',
+                       'Diabetes_Prevalence_Rate']
+
+# Economic indicators plotted on the overview trend charts
+TREND_COLUMNS = ['GDP', 'Health_Expenditure (% of GDP)', 'Life_Expectancy']
+
 
 def get_trend_icon(current, previous):
     """Returns FontAwesome class for trend direction."""
     return "fa-arrow-up text-danger" if current > previous else "fa-arrow-down text-success"
 
 
-def create_overview_layout(df):
+def build_top_countries_tables(df):
+    """
+    Precompute the top countries table for every metric and year pair.
+
+    Args:
+        df: DataFrame with required data
+
+    Returns:
+        dict: Table rows keyed by "<metric>|<year>", ready for the top-countries store.
+    """
+    both_df = df.loc[df['Gender'].eq('Both'), ['Year', 'Country', 'PrevalenceRate', 'IncidenceRate', 'MortalityRate']]
+    tables = {}
+    for year, year_df in both_df.groupby('Year', sort=False):
+        for metric in ['PrevalenceRate', 'IncidenceRate', 'MortalityRate']:
+            # Get top 7 countries, with the metric rounded to 2 decimal places
+            top_df = year_df.nlargest(7, metric)[['Country', metric]]
+            top_df[metric] = top_df[metric].astype('float64').round(2)
+            top_df.insert(0, 'Rank', range(1, len(top_df) + 1))
+            tables[f"{metric}|{int(year)}"] = top_df.to_dict('records')
+    return tables
+
+
+def compute_year_means(df):
+    """
+    Average the overview risk factors and economic indicators for every year.
+
+    Args:
+        df: DataFrame with required data
+
+    Returns:
+        pd.DataFrame: Indexed by sorted year, with the risk factors averaged over all rows and the
+        economic indicators over the rows where Gender is 'Both'.
+    """
+    risk_means = df[['Year', *RISK_FACTOR_COLUMNS]].groupby('Year').mean()
+    trend_means = df.loc[df['Gender'].eq('Both'), ['Year', *TREND_COLUMNS]].groupby('Year').mean()
+    return risk_means.join(trend_means, how='outer')
+
+
+def create_overview_layout(df, year_means=None):
     """
     Creates the main overview layout of the dashboard.
 
+    Args:
+        df: DataFrame with required data
+        year_means: Result of compute_year_means for df, computed here when not given
+
     Returns:
         html.Div: A container with all dashboard components including:
             - Header section
@@ -54,19 +92,24 @@ def create_overview_layout(df):
     # Calculate key statistics
     total_countries = df['Country'].nunique()
     latest_year = df['Year'].max()
-    avg_mortality = df[df['Gender'] == 'Both']['MortalityRate'].mean()
-    avg_prevalence = df[df['Gender'] == 'Both']['PrevalenceRate'].mean()
+    both_mask = df['Gender'].eq('Both')
+    avg_mortality = df.loc[both_mask, 'MortalityRate'].mean()
+    avg_prevalence = df.loc[both_mask, 'PrevalenceRate'].mean()
 
     # Define consistent container width
     CONTAINER_STYLE = "container-fluid px-4 py-3"
     CARD_STYLE = "mb-4 shadow-sm h-100"
 
+    if year_means is None:
+        year_means = compute_year_means(df)
 
-    # Calculate key statistics from the dataset
-    total_countries = df['Country'].nunique()
-    latest_year = df['Year'].max()
-    avg_mortality = df[df['Gender'] == 'Both']['MortalityRate'].mean()
-    avg_prevalence = df[df['Gender'] == 'Both']['PrevalenceRate'].mean()
+    # Risk factor means of the latest and the previous year, for the cards and their trend arrows
+    risk_means = year_means[RISK_FACTOR_COLUMNS].reindex([latest_year, latest_year - 1])
+    latest_risk, previous_risk = risk_means.iloc[0], risk_means.iloc[1]
+
+    # Yearly means of the economic indicators, shared by both trend charts; the years stay sorted
+    # because the lines are drawn in row order
+    yearly_trends = year_means[TREND_COLUMNS].dropna(how='all').reset_index()
 
     return html.Div([
         # Header Section
@@ -184,9 +227,18 @@ def create_overview_layout(df):
                                 ),
                             ], xs=12, md=6),
                         ]),
+                        dcc.Store(id='top-countries-store', data=build_top_countries_tables(df)),
                         dash_table.DataTable(
                             id='top-countries-table',
+                            # Only the visible rows are rendered; explicit widths let them be sized up front
+                            virtualization=True,
+                            fixed_rows={'headers': True},
+                            page_action='none',
                             style_table={'height': '350px', 'overflowY': 'auto'},
+                            style_cell_conditional=[
+                                {'if': {'column_id': 'Rank'}, 'width': '60px'},
+                                {'if': {'column_id': 'Country'}, 'width': '60%'}
+                            ],
                             style_cell={
                                 'textAlign': 'left',
                                 'padding': '10px',
@@ -215,9 +267,7 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         dcc.Graph(
                             figure=px.line(
-                                df[df['Gender'] == 'Both'].groupby('Year')[
-                                    ['GDP', 'Health_Expenditure (% of GDP)']
-                                ].mean().reset_index(),
+                                yearly_trends,
                                 x='Year',
                                 y=['GDP', 'Health_Expenditure (% of GDP)']
                             ).update_layout(
@@ -255,9 +305,7 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         dcc.Graph(
                             figure=px.line(
-                                df[df['Gender'] == 'Both'].groupby('Year')[
-                                    ['Life_Expectancy', 'Health_Expenditure (% of GDP)']
-                                ].mean().reset_index(),
+                                yearly_trends,
                                 x='Year',
                                 y=['Life_Expectancy', 'Health_Expenditure (% of GDP)']
                             ).update_layout(
@@ -300,11 +348,11 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         html.Div([
                             html.H4(
-                                f"{df[df['Year'] == df['Year'].max()]['Obesity_Prevalence_Rate'].mean():,.1f}%",
+                                f"{latest_risk['Obesity_Prevalence_Rate']:,.1f}%",
                                 style={"color": "navy", "display": "inline"}
                             ),
                             html.I(
-                                className=f"fas {'fa-arrow-up text-danger' if df[df['Year'] == df['Year'].max()]['Obesity_Prevalence_Rate'].mean() > df[df['Year'] == df['Year'].max() - 1]['Obesity_Prevalence_Rate'].mean() else 'fa-arrow-down text-success'}"
+                                className=f"fas {'fa-arrow-up text-danger' if latest_risk['Obesity_Prevalence_Rate'] > previous_risk['Obesity_Prevalence_Rate'] else 'fa-arrow-down text-success'}"
                             ),
                         ], style={"display": "flex", "justifyContent": "center", "alignItems": "center",
                                   "gap": "10px"}),
@@ -317,11 +365,11 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         html.Div([
                             html.H4(
-                                f"{df[df['Year'] == df['Year'].max()]['Activity_Prevalence_Rate'].mean():,.1f}%",
+                                f"{latest_risk['Activity_Prevalence_Rate']:,.1f}%",
                                 style={"color": "navy", "display": "inline"}
                             ),
                             html.I(
-                                className=f"fas {'fa-arrow-up text-success' if df[df['Year'] == df['Year'].max()]['Activity_Prevalence_Rate'].mean() > df[df['Year'] == df['Year'].max() - 1]['Activity_Prevalence_Rate'].mean() else 'fa-arrow-down text-danger'}"
+                                className=f"fas {'fa-arrow-up text-success' if latest_risk['Activity_Prevalence_Rate'] > previous_risk['Activity_Prevalence_Rate'] else 'fa-arrow-down text-danger'}"
                             ),
                         ], style={"display": "flex", "justifyContent": "center", "alignItems": "center",
                                   "gap": "10px"}),
@@ -334,11 +382,11 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         html.Div([
                             html.H4(
-                                f"{df[df['Year'] == df['Year'].max()]['Alcohol_Value'].mean():,.1f}",
+                                f"{latest_risk['Alcohol_Value']:,.1f}",
                                 style={"color": "navy", "display": "inline"}
                             ),
                             html.I(
-                                className=f"fas {'fa-arrow-up text-danger' if df[df['Year'] == df['Year'].max()]['Alcohol_Value'].mean() > df[df['Year'] == df['Year'].max() - 1]['Alcohol_Value'].mean() else 'fa-arrow-down text-success'}"
+                                className=f"fas {'fa-arrow-up text-danger' if latest_risk['Alcohol_Value'] > previous_risk['Alcohol_Value'] else 'fa-arrow-down text-success'}"
                             ),
                         ], style={"display": "flex", "justifyContent": "center", "alignItems": "center",
                                   "gap": "10px"}),
@@ -351,11 +399,11 @@ def create_overview_layout(df):
                     dbc.CardBody([
                         html.Div([
                             html.H4(
-                                f"{df[df['Year'] == df['Year'].max()]['Diabetes_Prevalence_Rate'].mean():,.1f}%",
+                                f"{latest_risk['Diabetes_Prevalence_Rate']:,.1f}%",
                                 style={"color": "navy", "display": "inline"}
                             ),
                             html.I(
-                                className=f"fas {'fa-arrow-up text-danger' if df[df['Year'] == df['Year'].max()]['Diabetes_Prevalence_Rate'].mean() > df[df['Year'] == df['Year'].max() - 1]['Diabetes_Prevalence_Rate'].mean() else 'fa-arrow-down text-success'}"
+                                className=f"fas {'fa-arrow-up text-danger' if latest_risk['Diabetes_Prevalence_Rate'] > previous_risk['Diabetes_Prevalence_Rate'] else 'fa-arrow-down text-success'}"
                             ),
                         ], style={"display": "flex", "justifyContent": "center", "alignItems": "center",
                                   "gap": "10px"}),
@@ -430,56 +478,27 @@ def create_overview_layout(df):
 
 def register_callbacks_overview(app,df):
     """
-    Sets up interactive callbacks for map and table updates.
+    Sets up interactive callbacks for table updates.
     Args:
         app: Dash app instance
         df: DataFrame with required data
     """
-    @app.callback(
-        Output("world-map", "figure"),
-        Input("year-selector", "value")
-    )
-    def update_map(selected_year):
-        filtered_df = df[df['Year'] == selected_year]
-        return px.choropleth(
-            filtered_df,
-            locations='Country_Code',  # Updated to use Country_Code instead of Country
-            color='PrevalenceRate',
-            title=f'Heart Disease Prevalence ({selected_year})',
-            color_continuous_scale='Reds'
-        )
-
-    @app.callback(
+    # Select the precomputed table in the browser: metric/year changes never reach the server
+    app.clientside_callback(
+        """
+        function(selected_metric, selected_year, tables) {
+            const rows = (tables || {})[selected_metric + '|' + selected_year] || [];
+            const columns = [
+                {name: 'Rank', id: 'Rank'},
+                {name: 'Country', id: 'Country'},
+                {name: selected_metric + ' (per 100,000)', id: selected_metric}
+            ];
+            return [rows, columns];
+        }
+        """,
         Output('top-countries-table', 'data'),
         Output('top-countries-table', 'columns'),
         Input('metric-selector', 'value'),
-        Input('year-selector', 'value')
+        Input('year-selector', 'value'),
+        Input('top-countries-store', 'data')
     )
-    def update_top_countries(selected_metric, selected_year):
-        # Filter data for the selected year and 'Both' gender
-        filtered_df = df[
-            (df['Year'] == selected_year) &
-            (df['Gender'] == 'Both')
-        ]
-
-        # Get top 8 countries
-        top_8_df = filtered_df.nlargest(7, selected_metric)[
-            ['Country', selected_metric]]
-
-        # Round the metric values to 2 decimal places
-        top_8_df[selected_metric] = top_8_df[selected_metric].round(2)
-
-        # Add rank column
-        top_8_df.insert(0, 'Rank', range(1, 8))
-
-        # Create columns for the table
-        columns = [
-            {'name': 'Rank', 'id': 'Rank'},
-            {'name': 'Country', 'id': 'Country'},
-            {'name': f'{selected_metric} (per 100,000)', 'id': selected_metric}
-        ]
-
-        # Convert DataFrame to dict for the table
-        data = top_8_df.to_dict('records')
-
-        return data, columns
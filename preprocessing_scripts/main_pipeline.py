@@ -1,61 +1,82 @@
 import pandas as pd
 from sklearn.impute import KNNImputer
-from numpy.polynomial.polynomial import Polynomial
 import numpy as np
 import pycountry
 from dictionary import country_code_mapping
 
+# Lower-cased pycountry names (short, official and common) mapped to their Alpha-3 code
+PYCOUNTRY_CODES = {
+    name.lower(): country.alpha_3
+    for country in pycountry.countries
+    for name in (country.name, getattr(country, 'official_name', None), getattr(country, 'common_name', None))
+    if name
+}
+
 def get_country_code(country_name):
     """Returns the ISO Alpha-3 country code given a country name."""
     country_name_normalized = country_name.strip().title()
     if country_name_normalized in country_code_mapping:
         return country_code_mapping[country_name_normalized]
+    if country_name_normalized.lower() in PYCOUNTRY_CODES:
+        return PYCOUNTRY_CODES[country_name_normalized.lower()]
     try:
         return pycountry.countries.lookup(country_name_normalized).alpha_3
     except LookupError:
         return None
 
+def get_country_codes(country_names):
+    """Returns the ISO Alpha-3 country codes for a Series of country names."""
+    codes = {name: get_country_code(name) for name in country_names.dropna().unique()}
+    return country_names.map(codes)
+
 def add_missing_years(df):
     """Adds missing years (1960-1989) for each country."""
-    years = list(range(1960, 1990))
-    new_rows = [
-        {**{col: np.nan for col in df.columns if col not in ['Country', 'Year', 'Country_Code']},
-         'Country': country, 'Year': year, 'Country_Code': df[df['Country'] == country]['Country_Code'].iloc[0]}
-        for country in df['Country'].unique() for year in years
-    ]
-    return pd.DataFrame(new_rows)
+    years = np.arange(1960, 1990)
+    countries = df['Country'].unique()
+    codes = df.drop_duplicates('Country').set_index('Country')['Country_Code'].reindex(countries)
+    new_rows = pd.DataFrame({
+        'Country': np.repeat(countries, len(years)),
+        'Year': np.tile(years, len(countries)),
+        'Country_Code': np.repeat(codes.to_numpy(), len(years)),
+    })
+    # The remaining columns are added as all-NaN float columns in a single reindex
+    return new_rows.reindex(columns=df.columns)
 
 def impute_with_polynomial(df, target_col, degree=2):
     """Imputes missing values using polynomial regression."""
-    known_data = df[df[target_col].notnull()]
-    if known_data.empty:
-        return df  # Skip if no data available
-    poly = Polynomial.fit(known_data["Year"], known_data[target_col], degree)
-    df[target_col] = poly(df["Year"])
+    missing = df[target_col].isna().to_numpy()
+    if missing.all() or not missing.any():
+        return df  # Skip if no data available or nothing to impute
+    years = df["Year"].to_numpy(dtype=float)
+    years -= years.mean()  # centre the years to keep the fit well conditioned
+    coefs = np.polyfit(years[~missing], df[target_col].to_numpy(dtype=float)[~missing], degree)
+    df.loc[missing, target_col] = np.polyval(coefs, years[missing])
     return df
 
 def prep_gapminder_data(gp_df, iso_df):
     """Prepares the Gapminder dataset for merging."""
-    iso_df.rename(columns={'English short name lower case': 'country', 'Alpha-3 code': 'Country_Code'}, inplace=True)
+    iso_df = iso_df.rename(columns={'English short name lower case': 'country', 'Alpha-3 code': 'Country_Code'})
     gp_df = gp_df.merge(iso_df[['country', 'Country_Code']], on="country", how="left")
-    gp_df["Country_Code"].fillna(gp_df["country"].map(country_code_mapping), inplace=True)
-    gp_df.rename(columns={'year': 'Year', 'gdpPercap': 'GDP', 'lifeExp': 'Life_Expectancy'}, inplace=True)
-    return gp_df
-
-def impute_with_knn(df, target_col, n_neighbors=5):
-    """Imputes missing values using KNN imputation."""
-    feature_cols = df.columns.difference(['Country', 'Country_Code', 'Age_Group', 'Gender', target_col])
-    impute_cols = feature_cols.append(pd.Index([target_col]))
-    imputer = KNNImputer(n_neighbors=n_neighbors)
-    df[target_col] = imputer.fit_transform(df[impute_cols])[..., -1]
+    # Only the countries missing from the ISO table go through the manual mapping
+    missing = gp_df["Country_Code"].isna()
+    gp_df.loc[missing, "Country_Code"] = gp_df.loc[missing, "country"].map(country_code_mapping)
+    return gp_df.rename(columns={'year': 'Year', 'gdpPercap': 'GDP', 'lifeExp': 'Life_Expectancy'})
+
+def impute_with_knn(df, target_cols, n_neighbors=5):
+    """Imputes missing values in all target columns with a single KNN pass."""
+    feature_cols = df.columns.difference(['Country', 'Country_Code', 'Age_Group', 'Gender'])
+    imputer = KNNImputer(n_neighbors=n_neighbors, keep_empty_features=True)
+    imputed = pd.DataFrame(imputer.fit_transform(df[feature_cols].astype('float32')),
+                           columns=feature_cols, index=df.index)
+    df[target_cols] = imputed[target_cols]
     return df
 
 # Load datasets
 print("Loading datasets...")
-weight_health_exp_df = pd.read_csv('datasets/processed_health_data.csv')
-diabetes_alcohol_df = pd.read_csv('datasets/processed_diabetes_alcohol.csv')
-gdp_obesity_physical_df = pd.read_csv('datasets/processed_activity_obesity_gdp.csv')
-heart_disease_df = pd.read_csv('datasets/processed_disease_metrics.csv')
+weight_health_exp_df = pd.read_parquet('datasets/processed_health_data.parquet', engine='pyarrow')
+diabetes_alcohol_df = pd.read_parquet('datasets/processed_diabetes_alcohol.parquet', engine='pyarrow')
+gdp_obesity_physical_df = pd.read_parquet('datasets/processed_activity_obesity_gdp.parquet', engine='pyarrow')
+heart_disease_df = pd.read_parquet('datasets/processed_disease_metrics.parquet', engine='pyarrow')
 print("Datasets loaded successfully.")
 
 # Standardizing column names
@@ -69,19 +90,25 @@ heart_disease_df['Gender'] = heart_disease_df['Gender'].map({0: 'Male', 1: 'Fema
 
 # Merge datasets
 print("Merging datasets...")
-merged_df = heart_disease_df.merge(diabetes_alcohol_df, on=['Country_Code', 'Country', 'Year', 'Gender'], how='outer')
-merged_df = merged_df.merge(gdp_obesity_physical_df, on=['Country_Code', 'Country', 'Year'], how='outer')
-merged_df = merged_df.merge(weight_health_exp_df, on=['Country_Code', 'Country', 'Year'], how='outer')
+# Anchored on the heart disease rows, so the imputer never visits rows the dashboard cannot show
+merged_df = heart_disease_df.merge(diabetes_alcohol_df, on=['Country_Code', 'Country', 'Year', 'Gender'],
+                                   how='left', sort=False)
+merged_df = merged_df.merge(gdp_obesity_physical_df, on=['Country_Code', 'Country', 'Year'], how='left', sort=False)
+merged_df = merged_df.merge(weight_health_exp_df, on=['Country_Code', 'Country', 'Year'], how='left', sort=False)
 print("Datasets merged successfully.")
 
+# Hold the repeated key columns as categoricals; Parquet keeps the dtype for the dashboard
+for col in ['Country', 'Country_Code', 'Gender', 'Age_Group']:
+    if col in merged_df.columns:
+        merged_df[col] = merged_df[col].astype('category')
+
 # List of columns to impute
 columns_to_impute = ['Alcohol_Value', 'IncidenceRate', 'PrevalenceRate', 'MortalityRate',
                      'Diabetes_Prevalence_Rate', 'Activity_Prevalence_Rate', 'Obesity_Prevalence_Rate',
                      'GDP', 'Health_Expenditure (% of GDP)', 'Life_Expectancy']
 
 # Apply KNN imputation
-for col in columns_to_impute:
-    merged_df = impute_with_knn(merged_df, target_col=col)
+merged_df = impute_with_knn(merged_df, target_cols=columns_to_impute)
 
 # Set negative GDP values to NaN
 merged_df.loc[merged_df['GDP'] < 0, 'GDP'] = np.nan
@@ -91,5 +118,5 @@ if 'BMI' in merged_df.columns:
     merged_df.drop('BMI', axis=1, inplace=True)
 
 # Save final cleaned data
-merged_df.to_csv('cleaned_final_data.csv', index=False)
-print("Data saved successfully as 'cleaned_final_data.csv'.")
+merged_df.to_parquet('cleaned_final_data.parquet', engine='pyarrow', compression='zstd', index=False)
+print("Data saved successfully as 'cleaned_final_data.parquet'.")
@@ -6,9 +6,7 @@ def read_file(file, columns_to_keep, new_column_names):
     """
     Read and process an Excel file with standardized formatting.
     """
-    df = pd.read_excel(file)
-    df.columns = df.iloc[1]
-    df = df.drop([0, 1], axis=0).reset_index(drop=True)
+    df = pd.read_excel(file, header=2, usecols=columns_to_keep)
     df = df[columns_to_keep]
     df.columns = new_column_names
     return df
@@ -35,10 +33,12 @@ def _merge_and_impute_activity_obesity(df1, df2, df3):
     df1.rename(columns={'Prevalence_Rate': 'Activity_Prevalence_Rate'}, inplace=True)
     df2.rename(columns={'Prevalence_Rate': 'Obesity_Prevalence_Rate'}, inplace=True)
 
+    # Drop the 'World' aggregate before merging, so the outer joins never build its rows
+    df1, df2, df3 = (df[df['Country'].ne('World')] for df in (df1, df2, df3))
+
     # Merge DataFrames
     merged_df = pd.merge(df1, df2, on=['Country', 'Code', 'Year'], how='outer')
     merged_df = pd.merge(merged_df, df3, on=['Country', 'Code', 'Year'], how='outer')
-    merged_df = merged_df[merged_df['Country'] != 'World']
 
     # Apply KNN imputation
     knn_imputer = KNNImputer(n_neighbors=5)
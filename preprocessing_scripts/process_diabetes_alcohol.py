@@ -1,7 +1,6 @@
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import KNNImputer
-from numpy.polynomial import Polynomial
+from numpy.polynomial import polynomial as P
 from dictionary import wrong_countries, region_mapping
 
 
@@ -27,40 +26,48 @@ def _diabetes_column_processing(df):
 
 def _adding_missing_years(df):
     """Add missing years to dataset with placeholder values."""
-    years_1980_to_1989 = list(range(1960, 1990))
+    years = np.arange(1960, 1990)
     countries = df['Location'].unique()
-    new_rows = []
+    codes = df.drop_duplicates('Location').set_index('Location')['Code'].reindex(countries)
+
+    # One placeholder row per country and year, built column-wise; the other columns are NaN
+    new_data = pd.DataFrame({
+        'Location': np.repeat(countries, len(years)),
+        'Year': np.tile(years, len(countries)),
+        'Code': np.repeat(codes.to_numpy(), len(years)),
+    }).reindex(columns=df.columns)
+    # Match the key dtypes of df, so the concat keeps categoricals and integer years as they are
+    new_data = new_data.astype(df.dtypes[['Location', 'Year', 'Code']].to_dict())
+    df = pd.concat([df, new_data], ignore_index=True, copy=False, sort=False)
+    df = df.sort_values(by=['Location', 'Year']).reset_index(drop=True)
+    return df
 
-    for country in countries:
-        for year in years_1980_to_1989:
-            new_row = {
-                'Location': country,
-                'Year': year,
-                'Code': df[df['Location'] == country]['Code'].iloc[0]
-            }
 
-            for col in df.columns:
-                if col not in ['Location', 'Year', 'Code']:
-                    new_row[col] = float('nan')
+def _fill_with_group_polynomial(df, group_cols, year_col, target_col, degree=2):
+    """Fill missing values from a polynomial fitted to each group's known years."""
+    values = df[target_col].to_numpy(dtype=float, copy=True)
+    years = df[year_col].to_numpy(dtype=float)
 
-            new_rows.append(new_row)
+    for positions in df.groupby(group_cols, sort=False).indices.values():
+        missing = np.isnan(values[positions])
+        # Groups without gaps, or with too few known years for the fit, are left as they are
+        if not missing.any() or (~missing).sum() <= degree:
+            continue
+        group_years = years[positions]
+        centre = group_years[~missing].mean()
+        coefs = P.polyfit(group_years[~missing] - centre, values[positions][~missing], degree)
+        values[positions[missing]] = P.polyval(group_years[missing] - centre, coefs)
 
-    new_data = pd.DataFrame(new_rows)
-    df = pd.concat([df, new_data], ignore_index=True)
-    df = df.sort_values(by=['Location', 'Year']).reset_index(drop=True)
+    df[target_col] = values
     return df
 
 
 def _impute_diabetes_data(df):
-    """Impute missing diabetes prevalence data using polynomial fitting."""
-    known_data = df[df["Prevalence of diabetes (18+ years)"].notnull()]
-    known_years = known_data["Year"]
-    known_prevalence = known_data["Prevalence of diabetes (18+ years)"]
-
-    poly = Polynomial.fit(known_years, known_prevalence, deg=2)
-    df["Prevalence of diabetes (18+ years)"] = poly(df["Year"])
-
-    return df
+    """Impute missing diabetes prevalence data using polynomial fitting per location and gender."""
+    target_col = "Prevalence of diabetes (18+ years)"
+    df = _fill_with_group_polynomial(df, ['Location', 'Gender'], 'Year', target_col)
+    # The placeholder years carry no gender, so they are fitted on all of the location's known years
+    return _fill_with_group_polynomial(df, ['Location'], 'Year', target_col)
 
 
 def _convert_year_to_int(df, column_name='Year'):
@@ -70,82 +77,56 @@ def _convert_year_to_int(df, column_name='Year'):
 
 
 def _impute_alcohol_data(alcohol_data):
-    """Impute missing alcohol data using KNN"""
-    location_mapping = {loc: i for i, loc in enumerate(alcohol_data['Location'].unique())}
-    code_mapping = {code: i for i, code in enumerate(alcohol_data['Code'].unique())}
-
-    alcohol_data['Location_Num'] = alcohol_data['Location'].map(location_mapping)
-    alcohol_data['Code_Num'] = alcohol_data['Code'].map(code_mapping)
-
-    features = ['Location_Num', 'Code_Num', 'Year', 'Alcohol_Value']
-    data_for_imputation = alcohol_data[features]
-
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(data_for_imputation)
-
-    imputer = KNNImputer(n_neighbors=5)
-    imputed_data = imputer.fit_transform(scaled_data)
-
-    imputed_data_original_scale = scaler.inverse_transform(imputed_data)
-    alcohol_data['Alcohol_Value'] = imputed_data_original_scale[:, 3]
-
-    alcohol_data.drop(['Location_Num', 'Code_Num'], axis=1, inplace=True)
+    """Impute missing alcohol data by interpolating each country's yearly series"""
+    # Gaps are interpolated within a country and its edges held at the nearest known year;
+    # countries without any value are left to the polynomial pass after the merge
+    by_year = alcohol_data.sort_values('Year')
+    alcohol_data['Alcohol_Value'] = by_year.groupby('Location', sort=False)['Alcohol_Value'].transform(
+        lambda values: values.interpolate(method='linear', limit_direction='both'))
 
     return alcohol_data
 
 
-def impute_with_polynomial( df, year_col, target_col, degree=2):
+def impute_with_polynomial(df, year_col, target_cols, degree=2):
     """
-    Impute missing values using polynomial regression on time series.
+    Impute missing values of several columns using polynomial regression on time series.
+    The Vandermonde matrix of the years is built once and shared by every column's fit.
     """
-    known_data = df[df[target_col].notnull()]
-    known_years = known_data[year_col]
-    known_values = known_data[target_col]
-
-    missing_data = df[df[target_col].isnull()]
-    missing_years = missing_data[year_col]
-
-    # Fit a polynomial to the known data
-    poly = Polynomial.fit(known_years, known_values, deg=degree)
-
-    # Predict missing values
-    predicted_values = poly(missing_years)
-
-    # Fill in the missing values
-    df.loc[df[target_col].isnull(), target_col] = predicted_values
+    years = df[year_col].to_numpy(dtype=float)
+    # Scale the years to [-1, 1] to keep the least-squares fit well conditioned
+    centre, half_range = (years.max() + years.min()) / 2, max((years.max() - years.min()) / 2, 1.0)
+    vander = np.vander((years - centre) / half_range, degree + 1)
+
+    for target_col in target_cols:
+        values = df[target_col].to_numpy(dtype=float)
+        missing = np.isnan(values)
+        if not missing.any() or (~missing).sum() <= degree:
+            continue
+        coefs = np.linalg.lstsq(vander[~missing], values[~missing], rcond=None)[0]
+        df.loc[missing, target_col] = vander[missing] @ coefs
     return df
 
 
 def _fill_missing_values_with_regional(df, region_mapping, value_column='Alcohol_Value',
                                        location_column='Location', year_column='Year'):
-    """Fill missing values using regional data"""
-    df_filled = df.copy()
-
-    for country, region in region_mapping.items():
-        if country in df_filled[location_column].values:
-            country_data = df_filled[df_filled[location_column] == country]
-            missing_years = country_data[country_data[value_column].isnull()][year_column].unique()
-
-            if len(missing_years) > 0:
-                regional_data = df_filled[df_filled[location_column] == region]
-                regional_values = \
-                    regional_data[regional_data[year_column].isin(missing_years)].set_index(year_column)[
-                        value_column]
-
-                for year in missing_years:
-                    df_filled.loc[
-                        (df_filled[location_column] == country) &
-                        (df_filled[year_column] == year),
-                        value_column
-                    ] = regional_values.get(year)
+    """Fill missing values using regional data, updating the value column of df in place"""
+    # Value of each region and year, joined onto every row through the row's mapped region
+    regional_values = df.loc[df[location_column].isin(set(region_mapping.values())),
+                             [location_column, year_column, value_column]]
+    regional_values = regional_values.rename(columns={location_column: 'Region', value_column: 'Regional_Value'})
+    row_regions = pd.DataFrame({
+        'Region': df[location_column].map(region_mapping),
+        year_column: df[year_column]
+    })
+    row_regions = row_regions.merge(regional_values, on=['Region', year_column], how='left',
+                                    validate='many_to_one', copy=False)
 
-    return df_filled
+    df[value_column] = df[value_column].fillna(pd.Series(row_regions['Regional_Value'].to_numpy(), index=df.index))
+    return df
 
 def _remove_wrong_countries(df, column_name='Location'):
     """Remove non-country entries from the dataset"""
-    df = df[~df[column_name].isin(wrong_countries)]
-    df.reset_index(drop=True, inplace=True)
-    return df
+    return df[~df[column_name].isin(wrong_countries)].reset_index(drop=True)
 
 
 def process_diabetes_alcohol(diabetes_data, alcohol_data):
@@ -163,12 +144,11 @@ def process_diabetes_alcohol(diabetes_data, alcohol_data):
     alcohol_processed = _remove_wrong_countries(alcohol_processed)
     alcohol_processed = _fill_missing_values_with_regional(alcohol_processed, region_mapping)
     alcohol_processed = _impute_alcohol_data(alcohol_processed)
-    merged_data = diabetes_processed.merge(alcohol_processed, on=['Location', 'Year', 'Code'], how='outer')
-    merged_data = impute_with_polynomial(merged_data, year_col="Year",
-                                                           target_col="Alcohol_Value", degree=2)
+    merged_data = diabetes_processed.merge(alcohol_processed, on=['Location', 'Year', 'Code'], how='outer',
+                                           copy=False)
     merged_data = impute_with_polynomial(merged_data, year_col="Year",
-                                                           target_col="Prevalence of diabetes (18+ years)",
-                                                           degree=2)
+                                         target_cols=["Alcohol_Value", "Prevalence of diabetes (18+ years)"],
+                                         degree=2)
     return merged_data
 
 
@@ -1,19 +1,35 @@
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
 import pandas as pd
 import numpy as np
+from numpy.polynomial import polynomial as P
 import pycountry
-from sklearn.preprocessing import LabelEncoder, PolynomialFeatures
-from sklearn.linear_model import LinearRegression
 from dictionary import country_code_dict
 
+# Columns of the GBD incidence, mortality and prevalence exports used by process_disease_metrics
+GBD_COLUMNS = ['location_name', 'sex_name', 'age_name', 'year', 'val']
+
+# Rows per block when predicting missing values from a multi-predictor polynomial
+PREDICTION_CHUNK_ROWS = 100_000
+
 
 def encode_categorical_columns(df, columns):
-    """Encode categorical columns using LabelEncoder"""
-    encoder = LabelEncoder()
+    """Encode categorical columns as the codes of their sorted labels"""
     for col in columns:
-        df[col] = encoder.fit_transform(df[col].astype(str))
+        df[col] = df[col].astype('category').cat.codes.astype(np.int32)
     return df
 
 
+def _monomial_basis(X, degree):
+    """Builds every monomial of the columns of X up to the given degree, constant term first."""
+    terms = [np.ones(len(X))]
+    for power in range(1, degree + 1):
+        for combo in combinations_with_replacement(range(X.shape[1]), power):
+            terms.append(np.prod(X[:, list(combo)], axis=1))
+    return np.column_stack(terms)
+
+
 def _impute_with_polynomial_fit(df, target_column, predictor_columns, degree=2):
     """Imputes missing values in the target column using polynomial regression."""
     if not isinstance(df, pd.DataFrame):
@@ -41,19 +57,30 @@ def _impute_with_polynomial_fit(df, target_column, predictor_columns, degree=2):
     X_train = df_valid.loc[~missing_mask, predictor_columns]
     y_train = df_valid.loc[~missing_mask, target_column]
 
-    poly = PolynomialFeatures(degree=degree)
-    X_train_poly = poly.fit_transform(X_train)
-
-    model = LinearRegression()
-    model.fit(X_train_poly, y_train)
+    X_missing = df.loc[missing_mask, predictor_columns].to_numpy(dtype=float)
+    X_train = X_train.to_numpy(dtype=float)
+    y_train = y_train.to_numpy(dtype=float)
+    # Centre the predictors so the squared terms stay well conditioned
+    centre = X_train.mean(axis=0)
+
+    if len(predictor_columns) == 1:
+        coefs = P.polyfit(X_train[:, 0] - centre[0], y_train, degree)
+        predicted = P.polyval(X_missing[:, 0] - centre[0], coefs)
+    else:
+        coefs = np.linalg.lstsq(_monomial_basis(X_train - centre, degree), y_train, rcond=None)[0]
+        # Predict in fixed-size chunks so only one chunk's monomial basis is held at a time
+        predicted = np.empty(len(X_missing))
+        for start in range(0, len(X_missing), PREDICTION_CHUNK_ROWS):
+            chunk = slice(start, start + PREDICTION_CHUNK_ROWS)
+            predicted[chunk] = _monomial_basis(X_missing[chunk] - centre, degree) @ coefs
 
     # Predict missing values
-    X_missing_poly = poly.transform(df.loc[missing_mask, predictor_columns])
-    df.loc[missing_mask, target_column] = np.maximum(model.predict(X_missing_poly), 0)
+    df.loc[missing_mask, target_column] = np.maximum(predicted, 0)
 
     return df
 
 
+@lru_cache(maxsize=None)
 def get_country_code(country_name):
     """Returns the ISO Alpha-3 country code given a country name"""
     country_name_normalized = country_name.strip().title()
@@ -88,13 +115,21 @@ def process_disease_metrics(incidence_data, mortality_data, prevalence_data):
         processed_df = processed_df[['Country', 'Gender', 'Year', 'Age_Group', rate_col]]
         processed_dfs.append(processed_df)
 
+    # Hold the string keys as categoricals with one shared, sorted set of categories per column,
+    # so the outer merges join on integer codes
+    key_dtypes = {
+        col: pd.CategoricalDtype(sorted(set().union(*(df[col].dropna().unique() for df in processed_dfs))))
+        for col in ['Country', 'Gender', 'Age_Group']
+    }
+    processed_dfs = [df.astype(key_dtypes) for df in processed_dfs]
+
     # Merge datasets
     df_combined = pd.merge(processed_dfs[0], processed_dfs[1],
                            on=['Country', 'Year', 'Gender', 'Age_Group'],
-                           how='outer')
+                           how='outer', copy=False)
     df_combined = pd.merge(df_combined, processed_dfs[2],
                            on=['Country', 'Year', 'Gender', 'Age_Group'],
-                           how='outer')
+                           how='outer', copy=False)
 
     df_combined = encode_categorical_columns(df_combined, ['Gender', 'Age_Group'])
 
@@ -104,6 +139,7 @@ def process_disease_metrics(incidence_data, mortality_data, prevalence_data):
 
     # Add country codes
     df_combined['Country'] = df_combined['Country'].astype(str).str.strip()
-    df_combined['Country_Code'] = df_combined['Country'].apply(get_country_code)
+    code_map = {country: get_country_code(country) for country in df_combined['Country'].unique()}
+    df_combined['Country_Code'] = df_combined['Country'].map(code_map)
 
     return df_combined
\ No newline at end of file
@@ -1,13 +1,20 @@
 import pandas as pd
 import pycountry
 
+# Columns of the WHO life expectancy export used by _process_supplemental_life_expectancy
+LIFE_EXPECTANCY_COLUMNS = ['SpatialDimValueCode', 'Dim1ValueCode', 'FactValueNumeric', 'Period']
+
+# Columns of the WHO overweight export used by _clean_overweight_data
+OVERWEIGHT_COLUMNS = ['SpatialDimValueCode', 'Location', 'Period', 'FactValueNumeric']
+
+# Valid ISO Alpha-3 country codes, read from pycountry once at import
+VALID_COUNTRY_CODES = frozenset(country.alpha_3 for country in pycountry.countries)
+
 
 def _clean_overweight_data(df):
-    """Clean and preprocess the overweight dataset"""
+    """Clean and preprocess the overweight dataset, read with its header row already applied"""
     # Select and rename relevant columns
-    df.columns = df.iloc[1]
-    df = df.drop([0, 1], axis=0).reset_index(drop=True)
-    df = df[['SpatialDimValueCode', 'Location', 'Period', 'FactValueNumeric']]
+    df = df[OVERWEIGHT_COLUMNS]
     df = df.rename(columns={
         'SpatialDimValueCode': 'Country_code',
         'Location': 'Country',
@@ -36,15 +43,13 @@ def _clean_world_health_data(df):
     ]
     df = df[~df['country'].isin(countries_to_remove)]
 
-    # Get valid ISO country codes
-    valid_country_codes = {country.alpha_3 for country in pycountry.countries}
-    df = df[df['country_code'].isin(valid_country_codes)]
+    # Keep valid ISO country codes only
+    df = df[df['country_code'].isin(VALID_COUNTRY_CODES)]
 
-    # Handle missing values
-    df['health_exp'] = df.groupby('country_code')['health_exp'].ffill()
-    df['health_exp'] = df.groupby('country_code')['health_exp'].bfill()
-    df['life_expect'] = df.groupby('country_code')['life_expect'].ffill()
-    df['life_expect'] = df.groupby('country_code')['life_expect'].bfill()
+    # Handle missing values, filling both columns along each country's years in one grouped pass
+    df = df.sort_values(['country_code', 'year'])
+    fill_cols = ['health_exp', 'life_expect']
+    df[fill_cols] = df.groupby('country_code', sort=False)[fill_cols].transform(lambda g: g.ffill().bfill())
 
     # Select and rename columns
     df = df.iloc[:, :5]
@@ -62,7 +67,7 @@ def _clean_world_health_data(df):
 def _process_supplemental_life_expectancy(df):
     """Process supplemental life expectancy data from WHO"""
     # Select relevant columns and filter for total population
-    df = df[['SpatialDimValueCode', 'Dim1ValueCode', 'FactValueNumeric', 'Period']]
+    df = df[LIFE_EXPECTANCY_COLUMNS]
     df = df[df['Dim1ValueCode'] == 'SEX_BTSX']
     df = df.drop(columns=['Dim1ValueCode'])
 
@@ -84,27 +89,28 @@ def _merge_and_clean_datasets(overweight_df, world_df, life_expectancy_df):
         overweight_df,
         world_df,
         on=['Country_code', 'Country', 'Year'],
-        how='left'
+        how='left',
+        copy=False
     )
 
     # Convert year to numeric
     merged_df['Year'] = merged_df['Year'].astype(int)
-    life_expectancy_df['Year'] = life_expectancy_df['Year']
-
-    # Fill missing life expectancy values with supplemental data
-    for index, row in life_expectancy_df.iterrows():
-        mask = (
-                (merged_df['Country_code'] == row['Country_code']) &
-                (merged_df['Year'] == row['Year']) &
-                (merged_df['Life_Expectancy'].isna())
-        )
-        merged_df.loc[mask, 'Life_Expectancy'] = row['Imputed_Life_Expectancy']
-
-    # Final interpolation for remaining missing values
-    merged_df['Life_Expectancy'] = merged_df['Life_Expectancy'].interpolate(
-        method='linear')
-    merged_df['Health_Expenditure'] = merged_df['Health_Expenditure'].interpolate(
-        method='linear')
+
+    # Fill missing life expectancy values with supplemental data, taking the first known value
+    # per country and year
+    supplemental = (life_expectancy_df.dropna(subset=['Imputed_Life_Expectancy'])
+                    .drop_duplicates(subset=['Country_code', 'Year'])
+                    [['Country_code', 'Year', 'Imputed_Life_Expectancy']])
+    merged_df = merged_df.merge(supplemental, on=['Country_code', 'Year'], how='left', validate='many_to_one',
+                                copy=False)
+    merged_df['Life_Expectancy'] = merged_df['Life_Expectancy'].fillna(merged_df.pop('Imputed_Life_Expectancy'))
+
+    # Final interpolation for remaining missing values, along each country's years so values never
+    # bleed between neighbouring countries
+    merged_df = merged_df.sort_values(['Country_code', 'Year']).reset_index(drop=True)
+    interpolate_cols = ['Life_Expectancy', 'Health_Expenditure']
+    merged_df[interpolate_cols] = merged_df.groupby('Country_code', sort=False)[interpolate_cols].transform(
+        lambda g: g.interpolate(method='linear', limit_direction='both'))
 
     return merged_df
 
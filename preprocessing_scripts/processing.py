@@ -1,9 +1,66 @@
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 from process_activity_obesity_gdp import process_activity_obesity_gdp
-from process_disease_metrics import process_disease_metrics
+from process_disease_metrics import process_disease_metrics, GBD_COLUMNS
 from process_diabetes_alcohol import process_diabetes_alcohol
-from process_overweight_health import process_overweight_health
+from process_overweight_health import (process_overweight_health, LIFE_EXPECTANCY_COLUMNS,
+                                       OVERWEIGHT_COLUMNS)
+
+
+def _activity_obesity_gdp_stage(data_files):
+    # Process activity, obesity, and GDP data
+    print("Processing Activity, Obesity, and GDP data...")
+    return process_activity_obesity_gdp()
+
+
+def _disease_metrics_stage(data_files):
+    # Load disease-related datasets
+    print("Processing Disease Metrics data...")
+    # The multi-threaded pyarrow reader parses only the GBD columns the processor keeps
+    incidence_data = pd.read_csv(data_files['incidence'], engine='pyarrow', usecols=GBD_COLUMNS)
+    mortality_data = pd.read_csv(data_files['mortality'], engine='pyarrow', usecols=GBD_COLUMNS)
+    prevalence_data = pd.read_csv(data_files['prevalence'], engine='pyarrow', usecols=GBD_COLUMNS)
+    return process_disease_metrics(incidence_data, mortality_data, prevalence_data)
+
+
+def _diabetes_alcohol_stage(data_files):
+    # Load diabetes and alcohol data
+    print("Processing Diabetes and Alcohol data...")
+    diabetes_data = pd.read_csv(data_files['diabetes'], engine='pyarrow')
+    alcohol_data = pd.read_excel(data_files['alcohol'])
+    return process_diabetes_alcohol(diabetes_data, alcohol_data)
+
+
+def _overweight_health_stage(data_files):
+    # Load overweight and world health data
+    print("Processing Overweight and World Health data...")
+    # The WHO export's column names sit on its third row, so only the needed columns are parsed
+    overweight_data = pd.read_excel(data_files['overweight'], header=2, usecols=OVERWEIGHT_COLUMNS)
+    world_health_data = pd.read_csv(data_files['world_health'], engine='pyarrow')
+    life_expectancy_data = pd.read_csv(data_files['life_expectancy'], engine='pyarrow',
+                                       usecols=LIFE_EXPECTANCY_COLUMNS)
+    return process_overweight_health(overweight_data, world_health_data, life_expectancy_data)
+
+
+# Independent processing stages, each loading its own inputs, keyed by their output name
+STAGES = {
+    'activity_obesity_gdp': _activity_obesity_gdp_stage,
+    'disease_metrics': _disease_metrics_stage,
+    'diabetes_alcohol': _diabetes_alcohol_stage,
+    'overweight_health': _overweight_health_stage,
+}
+
+
+# Parquet file written for each stage's output
+OUTPUT_FILES = {
+    'activity_obesity_gdp': 'datasets/processed_activity_obesity_gdp.parquet',
+    'disease_metrics': 'datasets/processed_disease_metrics.parquet',
+    'diabetes_alcohol': 'datasets/processed_diabetes_alcohol.parquet',
+    'overweight_health': 'datasets/processed_health_data.parquet',
+}
 
 
 class DataProcessor:
@@ -11,36 +68,13 @@ class DataProcessor:
         pass
 
     def process_all_data(self, data_files):
-        # Process activity, obesity, and GDP data
-        print("Processing Activity, Obesity, and GDP data...")
-        activity_obesity_gdp = process_activity_obesity_gdp()
-
-        # Load disease-related datasets
-        print("Processing Disease Metrics data...")
-        incidence_data = pd.read_csv(data_files['incidence'])
-        mortality_data = pd.read_csv(data_files['mortality'])
-        prevalence_data = pd.read_csv(data_files['prevalence'])
-        disease_metrics = process_disease_metrics(incidence_data, mortality_data, prevalence_data)
-
-        # Load diabetes and alcohol data
-        print("Processing Diabetes and Alcohol data...")
-        diabetes_data = pd.read_csv(data_files['diabetes'])
-        alcohol_data = pd.read_excel(data_files['alcohol'])
-        diabetes_alcohol = process_diabetes_alcohol(diabetes_data, alcohol_data)
-
-        # Load overweight and world health data
-        print("Processing Overweight and World Health data...")
-        overweight_data = pd.read_excel(data_files['overweight'])
-        world_health_data = pd.read_csv(data_files['world_health'])
-        life_expectancy_data = pd.read_csv(data_files['life_expectancy'])
-        overweight_health = process_overweight_health(overweight_data, world_health_data, life_expectancy_data)
-
-        return {
-            'activity_obesity_gdp': activity_obesity_gdp,
-            'disease_metrics': disease_metrics,
-            'diabetes_alcohol': diabetes_alcohol,
-            'overweight_health': overweight_health
-        }
+        # The stages share no state, so each runs in its own process
+        with ProcessPoolExecutor(max_workers=len(STAGES),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {executor.submit(stage, data_files): name for name, stage in STAGES.items()}
+            results = {futures[future]: future.result() for future in as_completed(futures)}
+
+        return {name: results[name] for name in STAGES}
 
 
 def main():
@@ -66,10 +100,8 @@ def main():
         processed_data = processor.process_all_data(data_files)
 
         # Save processed datasets
-        processed_data['activity_obesity_gdp'].to_csv('datasets/processed_activity_obesity_gdp.csv', index=False)
-        processed_data['disease_metrics'].to_csv('datasets/processed_disease_metrics.csv', index=False)
-        processed_data['diabetes_alcohol'].to_csv('datasets/processed_diabetes_alcohol.csv', index=False)
-        processed_data['overweight_health'].to_csv('datasets/processed_health_data.csv', index=False)
+        for name, path in OUTPUT_FILES.items():
+            processed_data[name].to_parquet(path, engine='pyarrow', compression='zstd', index=False)
 
         print("\nAll data processing completed successfully!")
 